@@ -0,0 +1,232 @@
+"""
+Load test for the example Flask services.
+
+Drives endpoints at a fixed concurrency and reports throughput and latency
+percentiles per endpoint. Each worker thread sends its next request as soon
+as the previous one completes (closed loop), cycling through the paths.
+
+    python3 bench.py python-example
+    python3 bench.py flask-example --concurrency 32 --duration 10
+    python3 bench.py systemctl --json
+    python3 bench.py --url http://localhost:8080 --paths /ping /stats
+
+Without --url the app is imported and called in-process through Flask's
+test client: no server, no network, the numbers measure the app code.
+flask-example then runs against fake_pymysql (SQLite) instead of MySQL.
+With --url the requests go over HTTP keep-alive connections to a running
+server, e.g. one started with gunicorn -c gunicorn.conf.py app:app.
+"""
+
+import argparse
+import http.client
+import importlib.util
+import itertools
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Callable, NamedTuple
+from urllib.parse import urlsplit
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+
+class Target(NamedTuple):
+    app_file: Path
+    paths: tuple[str, ...]
+
+
+TARGETS = {
+    "python-example": Target(REPO_ROOT / "application/python-example/app.py", ("/ping",)),
+    "flask-example": Target(REPO_ROOT / "application/flask-example/app.py", ("/ping", "/stats")),
+    "systemctl": Target(REPO_ROOT / "linux/systemctl/app.py", ("/", "/health")),
+}
+
+# Sends one GET and returns the HTTP status
+Client = Callable[[str], int]
+
+
+def load_app(name: str):
+    """Import a target's Flask app (flask-example with the SQLite stand-in for MySQL)."""
+    target = TARGETS[name]
+    if name == "flask-example":
+        sys.path.insert(0, str(Path(__file__).parent))
+        import fake_pymysql
+
+        sys.modules["pymysql"] = fake_pymysql
+    # The app's sibling modules (pool, schema, ...) are imported by plain name
+    sys.path.insert(0, str(target.app_file.parent))
+    spec = importlib.util.spec_from_file_location(f"{name.replace('-', '_')}_app", target.app_file)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    if hasattr(module, "db_ready"):
+        # Nothing listens on the MySQL port behind the SQLite stand-in
+        module.db_ready.probe = None
+        module.init_db(max_wait=10)
+    return module.app
+
+
+def in_process_client(app) -> Callable[[], Client]:
+    def make() -> Client:
+        client = app.test_client()
+        return lambda path: client.get(path).status_code
+
+    return make
+
+
+def http_client(url: str, timeout: float) -> Callable[[], Client]:
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https"):
+        raise ValueError(f"Unsupported URL: {url}")
+    conn_class = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+    prefix = parts.path.rstrip("/")
+
+    def make() -> Client:
+        # One keep-alive connection per worker, reopened after an error
+        conn = conn_class(parts.netloc, timeout=timeout)
+
+        def get(path: str) -> int:
+            try:
+                conn.request("GET", prefix + path)
+                response = conn.getresponse()
+                response.read()
+                return response.status
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                return 0
+
+        return get
+
+    return make
+
+
+def run(make_client: Callable[[], Client], paths: tuple[str, ...], concurrency: int,
+        duration: float, max_requests: int | None = None) -> tuple[dict, float]:
+    """Run the load; returns ({path: [(latency seconds, ok), ...]}, elapsed seconds)."""
+    results: dict[str, list] = {path: [] for path in paths}
+    issued = itertools.count()
+    start = threading.Barrier(concurrency + 1)
+    deadline = 0.0
+    lock = threading.Lock()
+
+    def worker(index: int) -> None:
+        client = make_client()
+        samples = {path: [] for path in paths}
+        cycle = itertools.islice(itertools.cycle(paths), index % len(paths), None)
+        start.wait()
+        for path in cycle:
+            if time.perf_counter() >= deadline:
+                break
+            if max_requests is not None and next(issued) >= max_requests:
+                break
+            began = time.perf_counter()
+            status = client(path)
+            samples[path].append((time.perf_counter() - began, 200 <= status < 400))
+        with lock:
+            for path, values in samples.items():
+                results[path].extend(values)
+
+    threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    deadline = time.perf_counter() + duration
+    began = time.perf_counter()
+    start.wait()
+    for thread in threads:
+        thread.join()
+    return results, time.perf_counter() - began
+
+
+def percentile(sorted_values: list[float], p: float) -> float | None:
+    """Percentile of sorted values, with linear interpolation between ranks."""
+    if not sorted_values:
+        return None
+    rank = (len(sorted_values) - 1) * p / 100
+    low = int(rank)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (rank - low)
+
+
+def summarize(samples: list, elapsed: float) -> dict:
+    latencies = sorted(latency * 1000 for latency, _ in samples)
+    return {
+        "requests": len(samples),
+        "errors": sum(1 for _, ok in samples if not ok),
+        "rps": len(samples) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "p99_ms": percentile(latencies, 99),
+        "max_ms": latencies[-1] if latencies else None,
+    }
+
+
+def _ms(value: float | None) -> str:
+    return "-" if value is None else f"{value:.2f}"
+
+
+def print_report(report: dict) -> None:
+    print(f"{report['target']}: {report['concurrency']} workers, {report['elapsed']:.1f}s")
+    print(f"{'path':<12} {'requests':>9} {'errors':>7} {'rps':>10} "
+          f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for path, row in report["paths"].items():
+        print(f"{path:<12} {row['requests']:>9} {row['errors']:>7} {row['rps']:>10.1f} "
+              f"{_ms(row['p50_ms']):>8} {_ms(row['p95_ms']):>8} {_ms(row['p99_ms']):>8} "
+              f"{_ms(row['max_ms']):>8}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Load test the example Flask services")
+    parser.add_argument("target", nargs="?", choices=sorted(TARGETS),
+                        help="app to run in-process (not needed with --url)")
+    parser.add_argument("--url", help="benchmark a running server instead, e.g. http://localhost:8080")
+    parser.add_argument("--paths", nargs="+", help="paths to request (default: the target's endpoints)")
+    parser.add_argument("-c", "--concurrency", type=int, default=8, help="worker threads (default: 8)")
+    parser.add_argument("-d", "--duration", type=float, default=5.0, help="seconds to run (default: 5)")
+    parser.add_argument("-n", "--requests", type=int, help="stop after this many requests")
+    parser.add_argument("--warmup", type=float, default=1.0,
+                        help="seconds of load before measuring (default: 1)")
+    parser.add_argument("--timeout", type=float, default=10.0, help="HTTP timeout in seconds")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+    if args.target is None and args.url is None:
+        parser.error("give a target or --url")
+    if args.target is None and not args.paths:
+        parser.error("--paths is required with --url unless a target is given")
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+    return args
+
+
+def main() -> int:
+    args = parse_args()
+    paths = tuple(args.paths or TARGETS[args.target].paths)
+    if args.url is not None:
+        make_client = http_client(args.url, args.timeout)
+        name = args.url
+    else:
+        make_client = in_process_client(load_app(args.target))
+        name = f"{args.target} (in-process)"
+
+    if args.warmup > 0:
+        run(make_client, paths, args.concurrency, args.warmup)
+    results, elapsed = run(make_client, paths, args.concurrency, args.duration, args.requests)
+
+    report = {
+        "target": name,
+        "concurrency": args.concurrency,
+        "elapsed": elapsed,
+        "paths": {path: summarize(samples, elapsed) for path, samples in results.items()},
+    }
+    report["paths"]["total"] = summarize(
+        [sample for samples in results.values() for sample in samples], elapsed
+    )
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+    return 1 if report["paths"]["total"]["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,118 @@
+"""
+SQLite-backed stand-in for the parts of pymysql that flask-example uses.
+
+Installed as `sys.modules["pymysql"]` by bench.py, so flask-example runs
+its real code paths (pool, schema, upserts) with no MySQL server. The MySQL
+dialect in schema.py is translated to SQLite on the fly. Timings measure the
+app and SQLite, not MySQL: compare runs with each other, not with production.
+"""
+
+import atexit
+import os
+import re
+import shutil
+import sqlite3
+import tempfile
+
+# One database file per process, removed at exit
+_directory = tempfile.mkdtemp(prefix="fake_pymysql-")
+atexit.register(shutil.rmtree, _directory, ignore_errors=True)
+DATABASE = os.path.join(_directory, "db.sqlite3")
+
+
+class Error(Exception):
+    pass
+
+
+class OperationalError(Error):
+    pass
+
+
+# Conflict targets for the upserts
+_PRIMARY_KEYS = {
+    "request_counts": "endpoint",
+    "request_count_shards": "endpoint, shard",
+}
+
+
+def _translate(query: str) -> str:
+    query = query.replace("%s", "?")
+    query = re.sub(r"\s+ON UPDATE CURRENT_TIMESTAMP", "", query)
+    query = re.sub(r"VARCHAR\(\d+\) PRIMARY KEY", "TEXT PRIMARY KEY", query)
+    # INSERT ... ON DUPLICATE KEY UPDATE col = expr -> upsert on the primary key
+    query = re.sub(r"VALUES\((\w+)\)", r"excluded.\1", query)
+    table = re.search(r"INSERT INTO (\w+)", query)
+    if table:
+        query = query.replace(
+            "ON DUPLICATE KEY UPDATE",
+            f"ON CONFLICT({_PRIMARY_KEYS[table.group(1)]}) DO UPDATE SET",
+        )
+    return query
+
+
+class Cursor:
+    def __init__(self, conn: "Connection") -> None:
+        self._conn = conn
+        self._cur = conn._db.cursor()
+
+    def __enter__(self) -> "Cursor":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def execute(self, query: str, args: tuple = ()) -> int:
+        try:
+            self._cur.execute(_translate(query), args)
+        except sqlite3.Error as e:
+            raise OperationalError(str(e)) from e
+        return self._cur.rowcount
+
+    def executemany(self, query: str, args) -> int:
+        try:
+            self._cur.executemany(_translate(query), list(args))
+        except sqlite3.Error as e:
+            raise OperationalError(str(e)) from e
+        return self._cur.rowcount
+
+    def fetchone(self):
+        return self._cur.fetchone()
+
+    def fetchall(self):
+        return self._cur.fetchall()
+
+    def close(self) -> None:
+        self._cur.close()
+
+
+class Connection:
+    def __init__(self) -> None:
+        # autocommit, like the app's pymysql connections; writers wait on each other
+        self._db = sqlite3.connect(
+            DATABASE, check_same_thread=False, isolation_level=None, timeout=5
+        )
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self.open = True
+
+    def __enter__(self) -> "Connection":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def cursor(self) -> Cursor:
+        return Cursor(self)
+
+    def ping(self, reconnect: bool = False) -> None:
+        if not self.open:
+            raise Error("connection is closed")
+
+    def close(self) -> None:
+        if self.open:
+            self.open = False
+            self._db.close()
+
+
+def connect(**kwargs) -> Connection:
+    # Connection settings (host, user, ...) do not apply to SQLite
+    return Connection()
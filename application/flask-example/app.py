@@ -1,24 +1,24 @@
+import atexit
 import os
-import time
+import signal
+import sys
+import threading
 
 import pymysql
 from flask import Flask, jsonify
 
-app = Flask(__name__)
-
+import schema
+from cache import TTLCache
+from counters import WriteBehindCounters
+from pool import ConnectionPool
+from readiness import Readiness, tcp_probe
+from schema import db_config, pool_config
 
-def _db_config() -> dict:
-    return {
-        "host": os.getenv("DB_HOST", "localhost"),
-        "port": int(os.getenv("DB_PORT", "3306")),
-        "user": os.getenv("DB_USER", "flaskuser"),
-        "password": os.getenv("DB_PASSWORD", "flaskpass"),
-        "database": os.getenv("DB_NAME", "flaskdb"),
-    }
+app = Flask(__name__)
 
 
 def _connect():
-    cfg = _db_config()
+    cfg = db_config()
     return pymysql.connect(
         host=cfg["host"],
         port=cfg["port"],
@@ -32,46 +32,103 @@ def _connect():
     )
 
 
-def init_db(max_attempts: int = 30, sleep_seconds: float = 1.0) -> None:
-    last_err: Exception | None = None
-    for _ in range(max_attempts):
-        try:
-            with _connect() as conn:
-                with conn.cursor() as cur:
-                    cur.execute(
-                        """
-                        CREATE TABLE IF NOT EXISTS request_counts (
-                            endpoint VARCHAR(64) PRIMARY KEY,
-                            count BIGINT NOT NULL DEFAULT 0,
-                            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                                ON UPDATE CURRENT_TIMESTAMP
-                        )
-                        """
-                    )
-            return
-        except Exception as e:  # noqa: BLE001 (educational example)
-            last_err = e
-            time.sleep(sleep_seconds)
-    raise RuntimeError(f"DB not ready after {max_attempts} attempts: {last_err}")
-
-
-def increment(endpoint: str) -> None:
-    with _connect() as conn:
+_pool: ConnectionPool | None = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ConnectionPool:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(
+                    _connect,
+                    ping=lambda conn: conn.ping(reconnect=False),
+                    **pool_config(),
+                )
+    return _pool
+
+
+# Dashboards poll /stats constantly: serve it from memory for a short TTL
+stats_cache = TTLCache(ttl=float(os.getenv("STATS_CACHE_TTL", "2.0")))
+# What a counter write does to the cached value: update, invalidate or none
+STATS_CACHE_WRITES = os.getenv("STATS_CACHE_WRITES", "update")
+
+
+def _cache_written(counts: dict[str, int]) -> None:
+    for endpoint, amount in counts.items():
+        if STATS_CACHE_WRITES == "update":
+            stats_cache.update(endpoint, lambda count: count + amount)
+        elif STATS_CACHE_WRITES == "invalidate":
+            stats_cache.invalidate(endpoint)
+
+
+def _probe_db() -> None:
+    cfg = db_config()
+    tcp_probe(cfg["host"], cfg["port"], timeout=1.0)
+
+
+def _setup_db() -> None:
+    schema.create_schema(_connect)
+    get_pool().fill()
+
+
+# The server accepts traffic at once; /ready reports 503 until this succeeds
+db_ready = Readiness(
+    _setup_db,
+    probe=_probe_db,
+    max_delay=float(os.getenv("DB_RETRY_MAX_DELAY", "5")),
+    on_retry=lambda attempt, delay, e: app.logger.warning(
+        "DB not ready (attempt %d, retrying in %.2fs): %s", attempt, delay, e
+    ),
+)
+
+
+def init_db(max_wait: float | None = 60.0) -> None:
+    """Set up the database in the background and block until it is ready."""
+    db_ready.start()
+    if not db_ready.wait(max_wait):
+        raise RuntimeError(
+            f"DB not ready after {max_wait}s ({db_ready.attempts} attempts): {db_ready.last_error}"
+        )
+
+
+def increment_many(counts: dict[str, int]) -> None:
+    if not db_ready.ready:
+        raise RuntimeError("database not ready")
+    with get_pool().connection() as conn:
         with conn.cursor() as cur:
-            cur.execute(
-                """
-                INSERT INTO request_counts (endpoint, count)
-                VALUES (%s, 1)
-                ON DUPLICATE KEY UPDATE count = count + 1
-                """,
-                (endpoint,),
-            )
+            cur.executemany(schema.INCREMENT_MANY, schema.increment_rows(counts))
+    _cache_written(counts)
+
+
+counters = WriteBehindCounters(
+    increment_many,
+    interval=float(os.getenv("COUNTER_FLUSH_INTERVAL", "1.0")),
+    max_pending=int(os.getenv("COUNTER_FLUSH_SIZE", "1000")),
+    on_error=lambda e: app.logger.warning("Counter flush failed, will retry: %s", e),
+)
+
+
+def _flush_counters_at_exit() -> None:
+    try:
+        counters.close()
+    except Exception as e:  # noqa: BLE001 (educational example)
+        app.logger.warning("Final counter flush failed, %s increments lost: %s",
+                           counters.pending("ping"), e)
+
+
+atexit.register(_flush_counters_at_exit)
 
 
 def get_count(endpoint: str) -> int:
-    with _connect() as conn:
+    return stats_cache.get(endpoint, lambda: _select_count(endpoint))
+
+
+def _select_count(endpoint: str) -> int:
+    with get_pool().connection() as conn:
         with conn.cursor() as cur:
-            cur.execute("SELECT count FROM request_counts WHERE endpoint = %s", (endpoint,))
+            cur.execute(schema.SELECT_COUNT, (endpoint,))
             row = cur.fetchone()
             if not row:
                 return 0
@@ -81,23 +138,31 @@ def get_count(endpoint: str) -> int:
 
 @app.get("/ping")
 def ping():
-    try:
-        increment("ping")
-    except Exception as e:  # noqa: BLE001 (educational example)
-        return jsonify({"error": "db_unavailable", "detail": str(e)}), 503
+    # Counted in memory; persisted by the counters' background flush
+    counters.add("ping")
     return "pong", 200
 
 
+@app.get("/ready")
+def ready():
+    status = db_ready.status()
+    return jsonify(status), 200 if status["ready"] else 503
+
+
 @app.get("/stats")
 def stats():
+    if not db_ready.ready:
+        return jsonify({"error": "db_not_ready", "detail": db_ready.last_error}), 503
     try:
-        count = get_count("ping")
+        count = counters.total("ping", lambda: get_count("ping"))
     except Exception as e:  # noqa: BLE001 (educational example)
         return jsonify({"error": "db_unavailable", "detail": str(e)}), 503
     return jsonify({"ping": count}), 200
 
 
 if __name__ == "__main__":
-    init_db()
+    # Exit through SystemExit so atexit flushes the pending counters
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    db_ready.start()
     app.run(host="0.0.0.0", port=8080, debug=False)
 
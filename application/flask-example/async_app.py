@@ -0,0 +1,189 @@
+"""
+Async build of the API in app.py: aiohttp on one event loop, with aiomysql.
+
+Same endpoints, schema and settings as app.py:
+
+- `GET /ping`: returns `pong` and increments the counter in MySQL
+- `GET /stats`: returns the current request count for `/ping`
+- `GET /ready`: 200 once the schema and the pool are set up, 503 before
+
+A request waiting on MySQL is a suspended coroutine rather than a blocked
+thread, so one process holds thousands of concurrent slow clients while
+the database sees at most DB_POOL_MAX connections.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+import aiomysql
+from aiohttp import web
+
+import schema
+from readiness import backoff_delays
+from schema import db_config, pool_config
+
+log = logging.getLogger(__name__)
+
+
+def _connect_args() -> dict:
+    cfg = db_config()
+    return {
+        "host": cfg["host"],
+        "port": cfg["port"],
+        "user": cfg["user"],
+        "password": cfg["password"],
+        "db": cfg["database"],
+        "autocommit": True,
+        "connect_timeout": 5,
+    }
+
+
+async def _connect() -> aiomysql.Connection:
+    return await aiomysql.connect(**_connect_args())
+
+
+class Database:
+    """
+    The shared aiomysql pool, set up in the background.
+
+    Same steps as readiness.Readiness in app.py: a TCP probe, then the schema
+    and the pool, retried with jittered exponential backoff until they succeed.
+    """
+
+    def __init__(self) -> None:
+        cfg = pool_config()
+        self.pool_config = cfg
+        self.pool: aiomysql.Pool | None = None
+        self.attempts = 0
+        self.last_error: str | None = None
+        self._started_at = time.monotonic()
+        self._ready_at: float | None = None
+
+    @property
+    def ready(self) -> bool:
+        return self.pool is not None
+
+    async def _attempt(self) -> None:
+        cfg = db_config()
+        _, writer = await asyncio.wait_for(asyncio.open_connection(cfg["host"], cfg["port"]), 1.0)
+        writer.close()
+        await schema.create_schema_async(_connect)
+        self.pool = await aiomysql.create_pool(
+            minsize=self.pool_config["min_size"],
+            maxsize=self.pool_config["max_size"],
+            pool_recycle=int(self.pool_config["recycle_seconds"]),
+            **_connect_args(),
+        )
+
+    async def setup(self) -> None:
+        delays = backoff_delays(maximum=float(os.getenv("DB_RETRY_MAX_DELAY", "5")))
+        while True:
+            self.attempts += 1
+            try:
+                await self._attempt()
+            except Exception as e:  # noqa: BLE001 (retried until it succeeds)
+                self.last_error = f"{type(e).__name__}: {e}"
+                delay = next(delays)
+                log.warning("DB not ready (attempt %d, retrying in %.2fs): %s", self.attempts, delay, e)
+                await asyncio.sleep(delay)
+                continue
+            self.last_error = None
+            self._ready_at = time.monotonic()
+            return
+
+    def status(self) -> dict:
+        waited = (self._ready_at or time.monotonic()) - self._started_at
+        return {
+            "ready": self.ready,
+            "attempts": self.attempts,
+            "waited_seconds": round(waited, 3),
+            "error": self.last_error,
+        }
+
+    @asynccontextmanager
+    async def cursor(self) -> AsyncIterator[aiomysql.Cursor]:
+        if self.pool is None:
+            raise RuntimeError("database not ready")
+        conn = await asyncio.wait_for(self.pool.acquire(), self.pool_config["timeout"])
+        try:
+            async with conn.cursor() as cur:
+                yield cur
+        except BaseException:
+            # Do not hand a connection in an unknown state to the next request
+            conn.close()
+            raise
+        finally:
+            self.pool.release(conn)
+
+    async def close(self) -> None:
+        if self.pool is not None:
+            self.pool.close()
+            await self.pool.wait_closed()
+
+
+DB = web.AppKey("db", Database)
+
+
+async def _database(app: web.Application) -> AsyncIterator[None]:
+    # The server accepts traffic at once; /ready reports 503 until setup is done
+    db = app[DB] = Database()
+    task = asyncio.create_task(db.setup())
+    yield
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+    await db.close()
+
+
+async def increment(app: web.Application, endpoint: str) -> None:
+    async with app[DB].cursor() as cur:
+        await cur.execute(schema.INCREMENT, (endpoint, schema.pick_shard()))
+
+
+async def get_count(app: web.Application, endpoint: str) -> int:
+    async with app[DB].cursor() as cur:
+        await cur.execute(schema.SELECT_COUNT, (endpoint,))
+        row = await cur.fetchone()
+        return int(row[0]) if row else 0
+
+
+async def ping(request: web.Request) -> web.Response:
+    try:
+        await increment(request.app, "ping")
+    except Exception as e:  # noqa: BLE001 (educational example)
+        return web.json_response({"error": "db_unavailable", "detail": str(e)}, status=503)
+    return web.Response(text="pong")
+
+
+async def ready(request: web.Request) -> web.Response:
+    status = request.app[DB].status()
+    return web.json_response(status, status=200 if status["ready"] else 503)
+
+
+async def stats(request: web.Request) -> web.Response:
+    try:
+        count = await get_count(request.app, "ping")
+    except Exception as e:  # noqa: BLE001 (educational example)
+        return web.json_response({"error": "db_unavailable", "detail": str(e)}, status=503)
+    return web.json_response({"ping": count})
+
+
+def create_app() -> web.Application:
+    app = web.Application()
+    app.cleanup_ctx.append(_database)
+    app.router.add_get("/ping", ping)
+    app.router.add_get("/stats", stats)
+    app.router.add_get("/ready", ready)
+    return app
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    # run_app() stops gracefully on SIGINT/SIGTERM and closes the pool
+    web.run_app(create_app(), host="0.0.0.0", port=int(os.getenv("PORT", "8080")))
@@ -0,0 +1,106 @@
+"""Small in-process TTL cache whose concurrent misses share one load."""
+
+import threading
+import time
+from typing import Any, Callable, Hashable
+
+
+class _Load:
+    __slots__ = ("done", "value", "error")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: BaseException | None = None
+
+
+class TTLCache:
+    """
+    Caches values for `ttl` seconds.
+
+    On a miss, `get(key, load)` calls `load()` once; callers asking for the
+    same key while it runs wait for that result instead of loading again
+    (request coalescing). A failed load is not cached and its exception is
+    raised in every waiting caller.
+
+    `update()` and `invalidate()` let writers keep a cached value current
+    instead of waiting for it to expire.
+    """
+
+    def __init__(self, ttl: float) -> None:
+        self.ttl = ttl
+        self._values: dict[Hashable, tuple[Any, float]] = {}  # key -> (value, expires_at)
+        self._loads: dict[Hashable, _Load] = {}
+        self._generations: dict[Hashable, int] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.loads = 0
+
+    def get(self, key: Hashable, load: Callable[[], Any]) -> Any:
+        with self._lock:
+            cached = self._values.get(key)
+            if cached is not None and cached[1] > time.monotonic():
+                self.hits += 1
+                return cached[0]
+            self.misses += 1
+            pending = self._loads.get(key)
+            if pending is None:
+                pending = self._loads[key] = _Load()
+                generation = self._generations.get(key, 0)
+                owner = True
+            else:
+                owner = False
+
+        if not owner:
+            pending.done.wait()
+            if pending.error is not None:
+                raise pending.error
+            return pending.value
+
+        try:
+            pending.value = load()
+        except BaseException as e:
+            pending.error = e
+            raise
+        finally:
+            with self._lock:
+                self.loads += 1
+                del self._loads[key]
+                # A write during the load may not be in the loaded value
+                if pending.error is None and self._generations.get(key, 0) == generation:
+                    self._values[key] = (pending.value, time.monotonic() + self.ttl)
+            pending.done.set()
+        return pending.value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._bump(key)
+            self._values[key] = (value, time.monotonic() + self.ttl)
+
+    def update(self, key: Hashable, func: Callable[[Any], Any]) -> None:
+        """Replace a cached value with func(value), keeping its expiry; no-op if not cached."""
+        with self._lock:
+            self._bump(key)
+            cached = self._values.get(key)
+            if cached is not None and cached[1] > time.monotonic():
+                self._values[key] = (func(cached[0]), cached[1])
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._bump(key)
+            self._values.pop(key, None)
+
+    def _bump(self, key: Hashable) -> None:
+        if key in self._loads:
+            self._generations[key] = self._generations.get(key, 0) + 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._values),
+                "hits": self.hits,
+                "misses": self.misses,
+                "loads": self.loads,
+                "ttl": self.ttl,
+            }
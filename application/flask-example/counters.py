@@ -0,0 +1,116 @@
+"""Write-behind request counters: increments are batched in memory and flushed together."""
+
+import threading
+from collections import Counter
+from typing import Callable
+
+
+class WriteBehindCounters:
+    """
+    Aggregates counter increments per key and persists them in batches.
+
+    `add()` only updates an in-memory delta. A background thread calls
+    `flush_batch({key: delta, ...})` every `interval` seconds, or as soon
+    as `max_pending` increments were added since the last attempt. If a
+    flush fails, its deltas are merged back and retried with the next one,
+    no sooner than `interval` seconds later. `close()` stops the thread
+    and flushes what is left.
+
+    Increments not yet flushed are lost if the process dies without
+    `close()`; at most one interval's worth.
+    """
+
+    def __init__(
+        self,
+        flush_batch: Callable[[dict[str, int]], None],
+        interval: float = 1.0,
+        max_pending: int = 1000,
+        on_error: Callable[[Exception], None] | None = None,
+    ) -> None:
+        self._flush_batch = flush_batch
+        self.interval = interval
+        self.max_pending = max_pending
+        self._on_error = on_error
+        self._pending: Counter[str] = Counter()
+        self._in_flight: Counter[str] = Counter()
+        # Increments added since the last flush attempt (the size trigger)
+        self._pending_total = 0
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="counter-flush", daemon=True)
+                self._thread.start()
+
+    def add(self, key: str, amount: int = 1) -> None:
+        with self._lock:
+            self._pending[key] += amount
+            self._pending_total += amount
+            full = self._pending_total >= self.max_pending
+        if self._thread is None:
+            self.start()
+        if full:
+            self._wakeup.set()
+
+    def pending(self, key: str) -> int:
+        """Increments of a key that are not persisted yet (including a flush in progress)."""
+        with self._lock:
+            return self._pending[key] + self._in_flight[key]
+
+    def total(self, key: str, read_persisted: Callable[[], int]) -> int:
+        """
+        Persisted value plus pending increments of a key.
+
+        `read_persisted()` runs while no flush is in progress, so a batch
+        is never counted twice or missed between the two reads.
+        """
+        with self._flush_lock:
+            return read_persisted() + self.pending(key)
+
+    def flush(self) -> None:
+        """Persist the pending increments now, as one batch."""
+        with self._flush_lock:
+            with self._lock:
+                if not self._pending:
+                    return
+                batch = self._pending
+                self._pending = Counter()
+                self._pending_total = 0
+                self._in_flight = batch
+            try:
+                self._flush_batch(dict(batch))
+            except Exception:
+                with self._lock:
+                    # Not counted in _pending_total again: a batch that keeps
+                    # failing must not fire the size trigger on every add()
+                    self._pending.update(batch)
+                    self._in_flight = Counter()
+                raise
+            with self._lock:
+                self._in_flight = Counter()
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:  # noqa: BLE001 (kept pending, retried next interval)
+                if self._on_error is not None:
+                    self._on_error(e)
+                # Back off for a full interval, whatever add() signals meanwhile
+                self._stopped.wait(self.interval)
+                self._wakeup.clear()
+
+    def close(self) -> None:
+        """Stop the background thread and flush the remaining increments."""
+        self._stopped.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval + 5)
+        self.flush()
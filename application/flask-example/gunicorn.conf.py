@@ -0,0 +1,35 @@
+"""
+Gunicorn settings for serving app.py in production.
+
+    gunicorn -c gunicorn.conf.py app:app
+
+The settings (and their environment variables) are shared with
+python-example: they are loaded from ../python-example/gunicorn.conf.py so
+tuning stays in one place. Only the worker hooks below are specific to
+this app.
+"""
+
+import runpy
+from pathlib import Path
+
+_BASE = Path(__file__).resolve().parent.parent / "python-example" / "gunicorn.conf.py"
+globals().update(
+    (name, value) for name, value in runpy.run_path(str(_BASE)).items() if not name.startswith("_")
+)
+
+
+# Each worker process has its own connection pool and write-behind counters
+
+
+def post_worker_init(worker):
+    # Creates the schema and fills the pool in the background; see /ready
+    from app import db_ready
+
+    db_ready.start()
+
+
+def worker_exit(server, worker):
+    # Persist the hits still pending in this worker before it goes away
+    from app import _flush_counters_at_exit
+
+    _flush_counters_at_exit()
@@ -0,0 +1,42 @@
+"""
+Move counts from the unsharded `request_counts` table into `request_count_shards`.
+
+    python3 migrate.py          # move the counts, keep the emptied old table
+    python3 migrate.py --drop   # move the counts, then drop the old table
+
+Uses the same DB_* environment variables as app.py. Safe to run more than
+once: each run moves whatever the old table holds in one transaction.
+"""
+
+import argparse
+
+import pymysql
+
+import schema
+from schema import db_config
+
+
+def _connect():
+    cfg = db_config()
+    return pymysql.connect(
+        host=cfg["host"],
+        port=cfg["port"],
+        user=cfg["user"],
+        password=cfg["password"],
+        database=cfg["database"],
+        autocommit=True,
+        connect_timeout=5,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--drop", action="store_true", help="drop request_counts after moving its counts")
+    args = parser.parse_args()
+
+    endpoints, total = schema.migrate_counts(_connect, drop=args.drop)
+    print(f"Moved {total} counts of {endpoints} endpoints into request_count_shards")
+
+
+if __name__ == "__main__":
+    main()
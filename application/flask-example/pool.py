@@ -0,0 +1,197 @@
+"""Thread-safe connection pool for the MySQL access in app.py."""
+
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator
+
+
+class PoolTimeout(Exception):
+    """No connection became available within the checkout timeout."""
+
+
+class _Entry:
+    __slots__ = ("conn", "created_at", "last_used")
+
+    def __init__(self, conn: Any) -> None:
+        self.conn = conn
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+
+
+# Granted to a waiter instead of an idle connection: open a new one
+_NEW = object()
+_CLOSED = object()
+
+
+class _Waiter:
+    __slots__ = ("event", "granted")
+
+    def __init__(self) -> None:
+        self.event = threading.Event()
+        self.granted: Any = None
+
+
+class ConnectionPool:
+    """
+    Keeps between min_size and max_size open connections.
+
+    - Checkout reuses the most recently returned idle connection; if none
+      is idle and the pool is below max_size, a new one is opened, otherwise
+      the caller waits up to `timeout` seconds. Waiters are served in
+      arrival order: a returned connection is handed to the oldest waiter.
+    - Connections older than `recycle_seconds` are closed instead of reused.
+    - Connections idle for more than `ping_after` seconds are checked with
+      `ping(conn)` before being handed out; dead ones are replaced.
+    - A connection whose block raised an exception is closed, not reused.
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], Any],
+        min_size: int = 1,
+        max_size: int = 10,
+        recycle_seconds: float = 3600.0,
+        ping_after: float = 30.0,
+        timeout: float = 5.0,
+        ping: Callable[[Any], None] | None = None,
+    ) -> None:
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError("pool sizes must satisfy 0 <= min_size <= max_size, max_size >= 1")
+        self._connect = connect
+        self.min_size = min_size
+        self.max_size = max_size
+        self.recycle_seconds = recycle_seconds
+        self.ping_after = ping_after
+        self.timeout = timeout
+        self._ping = ping
+        self._idle: deque[_Entry] = deque()
+        self._waiters: deque[_Waiter] = deque()
+        self._size = 0  # open connections (idle, checked out or being opened)
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def fill(self) -> None:
+        """Open connections until min_size are available."""
+        while True:
+            with self._lock:
+                if self._closed or self._size >= self.min_size:
+                    return
+                self._size += 1
+            self._release(self._open())
+
+    def _open(self) -> _Entry:
+        # The caller has already reserved a slot in self._size
+        try:
+            return _Entry(self._connect())
+        except Exception:
+            self._discard(None)
+            raise
+
+    def _wait(self, deadline: float) -> Any:
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("connection pool is closed")
+            if self._idle:
+                return self._idle.pop()
+            if self._size < self.max_size:
+                self._size += 1
+                return _NEW
+            waiter = _Waiter()
+            self._waiters.append(waiter)
+        if not waiter.event.wait(max(0.0, deadline - time.monotonic())):
+            with self._lock:
+                if waiter.granted is None:
+                    self._waiters.remove(waiter)
+                    raise PoolTimeout(f"no connection available after {self.timeout}s")
+        if waiter.granted is _CLOSED:
+            raise RuntimeError("connection pool is closed")
+        return waiter.granted
+
+    def _checkout(self) -> _Entry:
+        granted = self._wait(time.monotonic() + self.timeout)
+        if granted is _NEW:
+            return self._open()
+        entry = granted
+        now = time.monotonic()
+        if now - entry.created_at > self.recycle_seconds:
+            # Replace it, keeping its slot
+            _close(entry.conn)
+            return self._open()
+        if self._ping is not None and now - entry.last_used > self.ping_after:
+            try:
+                self._ping(entry.conn)
+            except Exception:  # noqa: BLE001 (dead connection, open another)
+                _close(entry.conn)
+                return self._open()
+        return entry
+
+    def _release(self, entry: _Entry) -> None:
+        with self._lock:
+            if self._closed:
+                self._size -= 1
+            else:
+                entry.last_used = time.monotonic()
+                if self._waiters:
+                    waiter = self._waiters.popleft()
+                    waiter.granted = entry
+                    waiter.event.set()
+                else:
+                    self._idle.append(entry)
+                return
+        _close(entry.conn)
+
+    def _discard(self, entry: _Entry | None) -> None:
+        if entry is not None:
+            _close(entry.conn)
+        with self._lock:
+            if self._waiters and not self._closed:
+                # Pass the freed slot on: the waiter opens a new connection
+                waiter = self._waiters.popleft()
+                waiter.granted = _NEW
+                waiter.event.set()
+            else:
+                self._size -= 1
+
+    @contextmanager
+    def connection(self) -> Iterator[Any]:
+        """Check out a connection for the duration of a with block."""
+        entry = self._checkout()
+        try:
+            yield entry.conn
+        except BaseException:
+            self._discard(entry)
+            raise
+        self._release(entry)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": self._size,
+                "idle": len(self._idle),
+                "waiting": len(self._waiters),
+                "max_size": self.max_size,
+            }
+
+    def close(self) -> None:
+        """Close idle connections; checked-out ones are closed when returned."""
+        with self._lock:
+            self._closed = True
+            idle = list(self._idle)
+            self._size -= len(idle)
+            self._idle.clear()
+            waiters = list(self._waiters)
+            self._waiters.clear()
+        for waiter in waiters:
+            waiter.granted = _CLOSED
+            waiter.event.set()
+        for entry in idle:
+            _close(entry.conn)
+
+
+def _close(conn: Any) -> None:
+    try:
+        conn.close()
+    except Exception:  # noqa: BLE001 (already broken)
+        pass
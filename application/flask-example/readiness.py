@@ -0,0 +1,112 @@
+"""Background database readiness with jittered exponential backoff."""
+
+import random
+import socket
+import threading
+import time
+from typing import Callable, Iterator
+
+
+def backoff_delays(initial: float = 0.1, maximum: float = 5.0, factor: float = 2.0) -> Iterator[float]:
+    """
+    Endless retry delays: exponential growth capped at `maximum`, with full jitter.
+
+    Each delay is drawn uniformly from [0, cap), so many instances starting
+    together do not retry against the database in lockstep.
+    """
+    cap = initial
+    while True:
+        yield random.uniform(0, cap)
+        cap = min(maximum, cap * factor)
+
+
+def tcp_probe(host: str, port: int, timeout: float = 1.0) -> None:
+    """Raise OSError unless something accepts TCP connections on host:port."""
+    with socket.create_connection((host, port), timeout=timeout):
+        pass
+
+
+class Readiness:
+    """
+    Runs `setup()` in a background thread until it succeeds.
+
+    Before each attempt the cheap `probe()` (e.g. a TCP connect) is tried;
+    the full `setup()` (MySQL handshake, schema) only runs once it passes.
+    Failed attempts are retried after `backoff_delays()`. `ready` turns
+    true after the first successful setup and `wait()` blocks until then.
+    """
+
+    def __init__(
+        self,
+        setup: Callable[[], None],
+        probe: Callable[[], None] | None = None,
+        initial_delay: float = 0.1,
+        max_delay: float = 5.0,
+        on_retry: Callable[[int, float, Exception], None] | None = None,
+    ) -> None:
+        self.setup = setup
+        self.probe = probe
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self._on_retry = on_retry
+        self._ready = threading.Event()
+        self._stopped = threading.Event()
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._started_at: float | None = None
+        self._ready_at: float | None = None
+        self.attempts = 0
+        self.last_error: str | None = None
+
+    @property
+    def ready(self) -> bool:
+        return self._ready.is_set()
+
+    def start(self) -> None:
+        """Start the background attempts (once); returns immediately."""
+        with self._lock:
+            if self._thread is None:
+                self._started_at = time.monotonic()
+                self._thread = threading.Thread(target=self._run, name="db-readiness", daemon=True)
+                self._thread.start()
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """Block until ready or timeout; returns whether it is ready."""
+        return self._ready.wait(timeout)
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+    def _attempt(self) -> None:
+        if self.probe is not None:
+            self.probe()
+        self.setup()
+
+    def _run(self) -> None:
+        delays = backoff_delays(self.initial_delay, self.max_delay)
+        while not self._stopped.is_set():
+            self.attempts += 1
+            try:
+                self._attempt()
+            except Exception as e:  # noqa: BLE001 (retried until it succeeds)
+                self.last_error = f"{type(e).__name__}: {e}"
+                delay = next(delays)
+                if self._on_retry is not None:
+                    self._on_retry(self.attempts, delay, e)
+                self._stopped.wait(delay)
+                continue
+            self.last_error = None
+            self._ready_at = time.monotonic()
+            self._ready.set()
+            return
+
+    def status(self) -> dict:
+        waited = 0.0
+        if self._started_at is not None:
+            waited = (self._ready_at or time.monotonic()) - self._started_at
+        return {
+            "ready": self.ready,
+            "attempts": self.attempts,
+            "waited_seconds": round(waited, 3),
+            "error": self.last_error,
+        }
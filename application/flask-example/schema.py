@@ -0,0 +1,123 @@
+"""Database settings, schema and queries shared by app.py and async_app.py."""
+
+import os
+import random
+from typing import Any, Awaitable, Callable
+
+
+def db_config() -> dict:
+    return {
+        "host": os.getenv("DB_HOST", "localhost"),
+        "port": int(os.getenv("DB_PORT", "3306")),
+        "user": os.getenv("DB_USER", "flaskuser"),
+        "password": os.getenv("DB_PASSWORD", "flaskpass"),
+        "database": os.getenv("DB_NAME", "flaskdb"),
+    }
+
+
+def pool_config() -> dict:
+    return {
+        "min_size": int(os.getenv("DB_POOL_MIN", "1")),
+        "max_size": int(os.getenv("DB_POOL_MAX", "10")),
+        "recycle_seconds": float(os.getenv("DB_POOL_RECYCLE", "3600")),
+        "timeout": float(os.getenv("DB_POOL_TIMEOUT", "5")),
+    }
+
+
+def counter_shards() -> int:
+    """Rows each counter is spread over (COUNTER_SHARDS); changing it keeps existing rows."""
+    return max(1, int(os.getenv("COUNTER_SHARDS", "16")))
+
+
+# Each endpoint's count is the sum of up to COUNTER_SHARDS rows. Writers pick
+# a random shard, so concurrent increments of a hot endpoint rarely wait on
+# the same row lock.
+CREATE_TABLE = """
+    CREATE TABLE IF NOT EXISTS request_count_shards (
+        endpoint VARCHAR(64) NOT NULL,
+        shard SMALLINT UNSIGNED NOT NULL,
+        count BIGINT NOT NULL DEFAULT 0,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            ON UPDATE CURRENT_TIMESTAMP,
+        PRIMARY KEY (endpoint, shard)
+    )
+"""
+
+INCREMENT = """
+    INSERT INTO request_count_shards (endpoint, shard, count)
+    VALUES (%s, %s, 1)
+    ON DUPLICATE KEY UPDATE count = count + 1
+"""
+
+# With executemany(), pymysql and aiomysql send this as one multi-row INSERT
+INCREMENT_MANY = """
+    INSERT INTO request_count_shards (endpoint, shard, count)
+    VALUES (%s, %s, %s)
+    ON DUPLICATE KEY UPDATE count = count + VALUES(count)
+"""
+
+SELECT_COUNT = "SELECT COALESCE(SUM(count), 0) FROM request_count_shards WHERE endpoint = %s"
+
+# The unsharded table of earlier versions, emptied by migrate_counts()
+LEGACY_TABLE = "request_counts"
+
+MIGRATE_COUNTS = f"""
+    INSERT INTO request_count_shards (endpoint, shard, count)
+    SELECT endpoint, 0, count FROM {LEGACY_TABLE}
+    ON DUPLICATE KEY UPDATE count = request_count_shards.count + VALUES(count)
+"""
+
+
+def pick_shard() -> int:
+    return random.randrange(counter_shards())
+
+
+def increment_rows(counts: dict[str, int]) -> list[tuple[str, int, int]]:
+    """INCREMENT_MANY parameters for a batch, one random shard per endpoint."""
+    # Sorted, so concurrent batches lock rows in the same order
+    return sorted((endpoint, pick_shard(), amount) for endpoint, amount in counts.items())
+
+
+def migrate_counts(connect: Callable[[], Any], drop: bool = False) -> tuple[int, int]:
+    """
+    Move the counts of the legacy request_counts table into shard 0.
+
+    Runs in one transaction that empties the legacy table, so it can be
+    repeated (e.g. after old app instances wrote more) without counting
+    anything twice. Returns (endpoints moved, total count moved).
+    """
+    with connect() as conn:
+        with conn.cursor() as cur:
+            cur.execute(CREATE_TABLE)
+            if not cur.execute("SHOW TABLES LIKE %s", (LEGACY_TABLE,)):
+                return 0, 0
+            conn.begin()
+            try:
+                cur.execute(f"SELECT COUNT(*), COALESCE(SUM(count), 0) FROM {LEGACY_TABLE} FOR UPDATE")
+                endpoints, total = cur.fetchone()
+                cur.execute(MIGRATE_COUNTS)
+                cur.execute(f"DELETE FROM {LEGACY_TABLE}")
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            if drop:
+                cur.execute(f"DROP TABLE {LEGACY_TABLE}")
+    return int(endpoints), int(total)
+
+
+def create_schema(connect: Callable[[], Any]) -> None:
+    """Connect once and create the tables; retries are up to the caller (see readiness.py)."""
+    with connect() as conn:
+        with conn.cursor() as cur:
+            cur.execute(CREATE_TABLE)
+
+
+async def create_schema_async(connect: Callable[[], Awaitable[Any]]) -> None:
+    """create_schema() for an async driver."""
+    conn = await connect()
+    try:
+        async with conn.cursor() as cur:
+            await cur.execute(CREATE_TABLE)
+    finally:
+        conn.close()
@@ -0,0 +1,34 @@
+"""
+Gunicorn settings for serving app.py in production.
+
+    gunicorn -c gunicorn.conf.py app:app
+
+These are the shared production settings: flask-example loads this file
+and adds its worker hooks, and linux/systemctl links to it. Every setting
+can be overridden with an environment variable. Sending SIGHUP to the
+master reloads the configuration and replaces the workers gracefully;
+SIGTERM lets in-flight requests finish before exiting.
+"""
+
+import multiprocessing
+import os
+
+bind = f"{os.getenv('HOST', '0.0.0.0')}:{os.getenv('PORT', '8080')}"
+
+# Pre-forked worker processes, each serving requests on a small thread pool
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+worker_class = "gthread"
+threads = int(os.getenv("GUNICORN_THREADS", "4"))
+
+# Seconds an idle keep-alive connection stays open
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "30"))
+# Seconds workers get to finish in-flight requests on reload or shutdown
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+
+# Replace each worker after this many requests (with jitter) to bound leaks
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "10000"))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", "1000"))
+
+accesslog = "-"
+errorlog = "-"
@@ -1,3 +1,6 @@
+import runpy
+from pathlib import Path
+
 import pytest
 from app import app
 
@@ -16,6 +19,11 @@ def test_ping_endpoint(client):
     assert response.data.decode('utf-8') == 'pong'
 
 
-
-
-
+def test_gunicorn_config_reads_environment(monkeypatch):
+    """Test that the production server settings come from the environment"""
+    monkeypatch.setenv('PORT', '9000')
+    monkeypatch.setenv('WEB_CONCURRENCY', '3')
+    config = runpy.run_path(str(Path(__file__).parent / 'gunicorn.conf.py'))
+    assert config['bind'] == '0.0.0.0:9000'
+    assert config['workers'] == 3
+    assert config['worker_class'] == 'gthread'
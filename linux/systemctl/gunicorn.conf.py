@@ -0,0 +1 @@
+../../application/python-example/gunicorn.conf.py
\ No newline at end of file
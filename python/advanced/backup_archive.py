@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+
+"""
+Streaming Backup Archive Writer
+
+This module writes backup archives without a staging directory:
+- Source files are added straight into the tar stream under their
+  archive names, using the metadata of the source file
+- The tar stream goes through a selectable compressor (gzip, zstd or none)
+  with a configurable compression level
+- gzip output can be compressed on several cores: the stream is cut into
+  blocks that are compressed in parallel and written, in order, as the
+  members of a standard multi-member gzip file (readable by tar xzf)
+
+zstd support requires the optional 'zstandard' package.
+
+Usage:
+    with ArchiveWriter(Path("backup.tar.gz"), compression="gzip", level=6) as archive:
+        archive.add_file(Path("/etc/hosts"), "backup/etc_hosts")
+"""
+
+import gzip
+import os
+import tarfile
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+COMPRESSORS = ('gzip', 'zstd', 'none')
+ARCHIVE_EXTENSIONS = {
+    'gzip': '.tar.gz',
+    'zstd': '.tar.zst',
+    'none': '.tar',
+}
+# gzip default matches tarfile's 'w:gz' mode; zstd default matches the zstd CLI
+DEFAULT_LEVELS = {
+    'gzip': 9,
+    'zstd': 3,
+}
+# Uncompressed size of each independently compressed gzip member
+COMPRESS_BLOCK_SIZE = 1024 * 1024
+
+
+def default_threads() -> int:
+    """Number of compression threads used when none is given: one per core."""
+    return os.cpu_count() or 1
+
+
+def _compress_block(data, level: int) -> bytes:
+    # wbits=31 writes a complete gzip member (header, deflate data, CRC32, size).
+    # zlib releases the GIL while compressing, so blocks run truly in parallel.
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    return compressor.compress(data) + compressor.flush()
+
+
+class ParallelGzipWriter:
+    """
+    Write-only file object that gzip-compresses a stream on several threads.
+
+    Data is cut into blocks of block_size bytes. Each block becomes one gzip
+    member; members are written to the underlying file in stream order. At
+    most two blocks per thread are in flight, which bounds memory use.
+    """
+
+    def __init__(self, raw, level: int = 9, threads: Optional[int] = None,
+                 block_size: int = COMPRESS_BLOCK_SIZE):
+        self._raw = raw
+        self.level = level
+        self.threads = max(1, threads or default_threads())
+        self.block_size = block_size
+        self.members = 0
+        self.closed = False
+        self._buffer = bytearray()
+        self._pending = deque()
+        self._executor = ThreadPoolExecutor(max_workers=self.threads)
+
+    def write(self, data) -> int:
+        self._buffer += data
+        while len(self._buffer) >= self.block_size:
+            block = self._buffer[:self.block_size]
+            del self._buffer[:self.block_size]
+            self._submit(block)
+        return len(data)
+
+    def _submit(self, block):
+        while len(self._pending) >= 2 * self.threads:
+            self._write_member(self._pending.popleft().result())
+        self._pending.append(self._executor.submit(_compress_block, block, self.level))
+        while self._pending and self._pending[0].done():
+            self._write_member(self._pending.popleft().result())
+
+    def _write_member(self, member: bytes):
+        self._raw.write(member)
+        self.members += 1
+
+    def flush(self):
+        pass
+
+    def close(self):
+        """Compress the remaining data and wait for all blocks to be written."""
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            if self._buffer or self.members + len(self._pending) == 0:
+                # An empty stream still needs one (empty) member to be valid gzip
+                self._submit(bytes(self._buffer))
+                self._buffer = bytearray()
+            while self._pending:
+                self._write_member(self._pending.popleft().result())
+        finally:
+            self._executor.shutdown(wait=True)
+
+
+class ArchiveMemberError(Exception):
+    """A member failed after its header was written; the archive is incomplete."""
+
+
+class ArchiveWriter:
+    """Writes a tar archive through a streaming compressor."""
+
+    def __init__(self, path: Path, compression: str = 'gzip', level: Optional[int] = None,
+                 threads: int = 1):
+        if compression not in COMPRESSORS:
+            raise ValueError(f"Unknown compression: {compression}")
+        if compression == 'zstd' and not ZSTD_AVAILABLE:
+            raise RuntimeError("zstd compression requires the 'zstandard' package "
+                               "(pip install zstandard)")
+        self.path = path
+        self.compression = compression
+        self.level = level if level is not None else DEFAULT_LEVELS.get(compression)
+        self.threads = threads if threads > 0 else default_threads()
+        self.files = 0
+        self._raw = None
+        self._stream = None
+        self._tar = None
+
+    def __enter__(self):
+        self._raw = open(self.path, 'wb')
+        try:
+            self._stream = self._open_compressor(self._raw)
+            # 'w|' writes a plain stream: no seeking back into the output
+            self._tar = tarfile.open(fileobj=self._stream, mode='w|')
+        except BaseException:
+            self._raw.close()
+            os.unlink(self.path)
+            raise
+        return self
+
+    def _open_compressor(self, raw):
+        if self.compression == 'gzip':
+            if self.threads > 1:
+                return ParallelGzipWriter(raw, self.level, self.threads)
+            return gzip.GzipFile(filename='', fileobj=raw, mode='wb', compresslevel=self.level)
+        if self.compression == 'zstd':
+            # zstd has its own multi-threaded mode; 0 keeps it single-threaded
+            compressor = zstandard.ZstdCompressor(
+                level=self.level, threads=self.threads if self.threads > 1 else 0)
+            return compressor.stream_writer(raw, closefd=False)
+        return raw
+
+    def add_file(self, source: Path, arcname: str):
+        """
+        Add a single file, streaming its content into the archive.
+
+        An OSError means the file was skipped and the archive is intact.
+        Once the member header is written, a failure (e.g. the file shrank
+        below the size recorded in the header) raises ArchiveMemberError:
+        the archive is corrupt and must be abandoned.
+        """
+        # Open first: an unreadable file fails before anything is written
+        with open(source, 'rb') as f:
+            tarinfo = self._tar.gettarinfo(arcname=arcname, fileobj=f)
+            try:
+                self._tar.addfile(tarinfo, f)
+            except OSError as e:
+                raise ArchiveMemberError(f"{source} changed while it was archived: {e}") from e
+        self.files += 1
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if self._tar is not None:
+                self._tar.close()
+            if self._stream is not None and self._stream is not self._raw:
+                self._stream.close()
+        finally:
+            self._raw.close()
+            if exc_type is not None and self.path.exists():
+                # Do not leave a truncated archive behind
+                os.unlink(self.path)
+        return False
+
+
+def archive_path(directory: Path, name: str, compression: str) -> Path:
+    """Build the archive file name for a compressor."""
+    return directory / f"{name}{ARCHIVE_EXTENSIONS[compression]}"
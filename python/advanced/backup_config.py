@@ -7,92 +7,263 @@ This script backs up important system configuration files:
 - Network configuration
 - System configuration files
 - Service configuration files
-- Creates timestamped archive
+- Files are selected by backup sets (include/exclude globs over whole trees)
+- Creates timestamped archive, skipped when no file changed since the last one
+- Incremental mode: content-addressed store plus a small manifest per run
+- Every snapshot is recorded in backups/snapshots.json for retention
 
 Usage:
-    python3 backup_config.py
+    python3 backup_config.py [--sets FILE] [--force]
+    python3 backup_config.py [--compress gzip|zstd|none] [--level N] [--threads N]
+    python3 backup_config.py --incremental [--prune]
+    python3 backup_config.py --restore SNAPSHOT_ID DEST_DIR
 
 Author: DevOps Automation Team
 Version: 1.0.0
 """
 
+import argparse
+import itertools
+import json
 import os
-import shutil
 import sys
-import tarfile
 from datetime import datetime
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent))
-from common import init_directories, print_info, print_success, print_warning, log, BACKUP_DIR
+from common import (
+    init_directories, print_info, print_success, print_warning, print_error, log,
+    format_bytes, BACKUP_DIR, BACKUP_SETS_FILE
+)
+from backup_store import ContentStore
+from backup_archive import ArchiveWriter, ArchiveMemberError, archive_path, COMPRESSORS
+from backup_sets import load_backup_sets, resolve_backup_sets, ChangeDetector
+from backup_retention import RetentionPolicy, record_snapshot, prune_backups, add_policy_arguments
 
+# Signatures of the files in the last archive, for change detection
+ARCHIVE_STATE_FILE = BACKUP_DIR / "archive-state.json"
 
-def backup_config_file(source_path: Path, dest_dir: Path):
-    """Backup a single configuration file."""
-    if not source_path.exists() or not source_path.is_file():
-        return False
+
+def archive_name(source_path: Path) -> str:
+    """Archive member name of a source path (/etc/nginx/nginx.conf -> etc/nginx/nginx.conf)."""
+    return str(source_path).lstrip('/')
+
+
+def _warn_unreadable(path: str, error: OSError):
+    print_warning(f"Cannot read {path}: {error.strerror or error}")
+
+
+def resolve_files(sets_file: Path) -> dict:
+    """Resolve the configured backup sets into {path: stat result}."""
+    backup_sets = load_backup_sets(sets_file)
+    files = resolve_backup_sets(backup_sets, on_error=_warn_unreadable)
+    print_info(f"Resolved {len(files)} files from {len(backup_sets)} backup sets")
+    return files
+
+
+def load_archive_state() -> dict:
+    """Load the file signatures recorded by the last archive run, if any."""
+    try:
+        with open(ARCHIVE_STATE_FILE, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def write_archive_state(name: str, archive_file: Path, entries: list):
+    tmp_file = ARCHIVE_STATE_FILE.with_name(ARCHIVE_STATE_FILE.name + '.tmp')
+    with open(tmp_file, 'w') as f:
+        json.dump({'id': name, 'archive': str(archive_file), 'files': entries},
+                  f, separators=(',', ':'))
+    os.replace(tmp_file, ARCHIVE_STATE_FILE)
+
+
+def describe_changes(changes) -> str:
+    return (f"{len(changes.modified)} modified, {len(changes.added)} added, "
+            f"{len(changes.removed)} removed, {len(changes.unchanged)} unchanged")
+
+
+def backup_archive(files: dict, name: str, compression: str, level, threads: int = 0,
+                   force: bool = False):
+    """
+    Stream configuration files straight into a compressed archive.
+
+    The run is skipped when no file changed since the last archive (compared
+    by stat signature, without reading any content), unless force is set.
+    """
+    state = load_archive_state()
+    changes = ChangeDetector(state.get('files', [])).compare(files)
+    if (state and not force and not (changes.modified or changes.added or changes.removed)
+            and Path(state['archive']).exists()):
+        print_success(f"No changes since {state['id']}, archive not rewritten "
+                      f"({len(changes.unchanged)} files checked)")
+        log("INFO", f"Configuration backup skipped: no changes since {state['id']}")
+        return
+    if state:
+        print_info(f"Changes since {state['id']}: {describe_changes(changes)}")
     
+    archive_file = archive_path(BACKUP_DIR, name, compression)
+    entries = []
     try:
-        # Create destination filename by replacing / with _
-        dest_filename = str(source_path).replace('/', '_').lstrip('_')
-        dest_path = dest_dir / dest_filename
-        
-        shutil.copy2(source_path, dest_path)
-        return True
-    except (OSError, PermissionError) as e:
-        print_warning(f"Could not backup {source_path}: {e}")
-        return False
+        with ArchiveWriter(archive_file, compression, level, threads) as archive:
+            for path, st in files.items():
+                try:
+                    archive.add_file(Path(path), f"{name}/{archive_name(path)}")
+                except (OSError, PermissionError) as e:
+                    print_warning(f"Could not backup {path}: {e}")
+                    continue
+                entries.append({'path': path, 'size': st.st_size,
+                                'mtime_ns': st.st_mtime_ns, 'inode': st.st_ino})
+            backed_up = archive.files
+            if backed_up == 0:
+                raise ValueError("No configuration files were backed up")
+    except ValueError as e:
+        print_warning(str(e))
+        return
+    except ArchiveMemberError as e:
+        # ArchiveWriter has removed the incomplete archive
+        print_error(f"Backup aborted: {e}")
+        log("ERROR", f"Configuration backup aborted: {e}")
+        return
+    except Exception as e:
+        print_warning(f"Could not create archive: {e}")
+        return
+    
+    write_archive_state(name, archive_file, entries)
+    record_snapshot(name, 'archive', archive_file)
+    print_success(f"Configuration backup completed: {backed_up} files backed up")
+    print_info(f"Backup archive: {archive_file} ({format_bytes(archive_file.stat().st_size)})")
+    log("INFO", f"Configuration backup: {backed_up} files")
 
 
-def main():
-    """Main function."""
-    init_directories()
+def unique_snapshot_id(base: str) -> str:
+    """
+    The snapshot id base, or base_1, base_2, ... if a backup of that id exists.
+
+    Ids have one-second resolution; this keeps two runs within the same
+    second from writing to the same archive or manifest.
+    """
+    manifests_dir = ContentStore().manifests_dir
+    for suffix in itertools.count():
+        snapshot_id = base if suffix == 0 else f"{base}_{suffix}"
+        if (not (manifests_dir / f"{snapshot_id}.json").exists()
+                and not any(BACKUP_DIR.glob(f"{snapshot_id}.tar*"))):
+            return snapshot_id
+
+
+def backup_incremental(files: dict, snapshot_id: str):
+    """
+    Back up files into the content-addressed store and write a manifest.
+
+    Files whose stat signature matches the previous manifest reuse its
+    digest and are not read at all.
+    """
+    store = ContentStore()
+    store.init()
+    previous = store.latest_manifest()
+    detector = ChangeDetector(previous['files'] if previous else [])
     
-    print_info("Backing up system configuration files...")
+    entries = []
+    new_bytes = 0
+    skipped_reads = 0
+    for path, st in files.items():
+        known = detector.unchanged_entry(path, st)
+        digest = None
+        if known is not None and store.has_object(known['sha256']):
+            digest = known['sha256']
+            skipped_reads += 1
+        try:
+            entry = store.put_file(Path(path), digest, st)
+        except (OSError, PermissionError) as e:
+            print_warning(f"Could not backup {path}: {e}")
+            continue
+        entries.append(entry)
+        if entry['new']:
+            new_bytes += entry['size']
+            print_info(f"Backed up: {path}")
     
-    backup_timestamp = datetime.now().strftime('%Y%m%d-%H%M%S')
-    backup_path = BACKUP_DIR / f"config-backup-{backup_timestamp}"
-    backup_path.mkdir(exist_ok=True)
+    if not entries:
+        print_warning("No configuration files were backed up")
+        return
     
-    # Important configuration files to backup
-    config_files = [
-        Path("/etc/hosts"),
-        Path("/etc/resolv.conf"),
-        Path("/etc/fstab"),
-        Path("/etc/crontab"),
-        Path("/etc/ssh/sshd_config"),
-        Path("/etc/nginx/nginx.conf"),
-        Path("/etc/apache2/apache2.conf"),
-        Path("/etc/docker/daemon.json"),
-    ]
+    try:
+        manifest_path = store.write_manifest(snapshot_id, entries)
+    except FileExistsError:
+        # Another run took the id after unique_snapshot_id() checked it
+        snapshot_id = unique_snapshot_id(snapshot_id)
+        manifest_path = store.write_manifest(snapshot_id, entries)
+    record_snapshot(snapshot_id, 'incremental', manifest_path)
+    changed = sum(1 for entry in entries if entry['new'])
+    print_success(f"Incremental backup completed: {len(entries)} files, "
+                  f"{changed} with new content ({format_bytes(new_bytes)} stored), "
+                  f"{skipped_reads} unchanged and not read")
+    print_info(f"Manifest: {manifest_path}")
+    log("INFO", f"Incremental configuration backup: {len(entries)} files, {changed} new, "
+                f"{skipped_reads} unchanged")
+
+
+def restore_snapshot(snapshot_id: str, dest_dir: Path):
+    """Restore an incremental snapshot into dest_dir."""
+    store = ContentStore()
+    manifest_path = store.manifests_dir / f"{snapshot_id}.json"
+    if not manifest_path.exists():
+        print_error(f"Snapshot not found: {snapshot_id}")
+        sys.exit(1)
+    restored = store.restore(store.load_manifest(manifest_path), dest_dir)
+    print_success(f"Restored {restored} files from {snapshot_id} to {dest_dir}")
+    log("INFO", f"Restored snapshot {snapshot_id}: {restored} files")
+
+
+def parse_args(argv=None):
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Backup system configuration files")
+    parser.add_argument('--sets', type=Path, default=BACKUP_SETS_FILE, metavar='FILE',
+                        help=f"backup set definitions (default: {BACKUP_SETS_FILE.name}, "
+                             "built-in sets if it does not exist)")
+    parser.add_argument('--force', action='store_true',
+                        help="write a new archive even if no file changed")
+    parser.add_argument('--incremental', action='store_true',
+                        help="store files by content hash and write only a manifest per run")
+    parser.add_argument('--compress', choices=COMPRESSORS, default='gzip',
+                        help="archive compression (default: gzip; zstd needs 'zstandard')")
+    parser.add_argument('--level', type=int,
+                        help="compression level (default: 9 for gzip, 3 for zstd)")
+    parser.add_argument('--threads', type=int, default=0,
+                        help="compression threads (default: 0, one per CPU core)")
+    parser.add_argument('--restore', nargs=2, metavar=('SNAPSHOT_ID', 'DEST_DIR'),
+                        help="restore an incremental snapshot into DEST_DIR")
+    parser.add_argument('--prune', action='store_true',
+                        help="prune old snapshots after the backup (see backup_retention.py)")
+    add_policy_arguments(parser)
+    return parser.parse_args(argv)
+
+
+def main():
+    """Main function."""
+    args = parse_args()
+    init_directories()
     
-    backed_up = 0
+    if args.restore:
+        restore_snapshot(args.restore[0], Path(args.restore[1]))
+        return
     
-    for config_file in config_files:
-        if backup_config_file(config_file, backup_path):
-            print_info(f"Backed up: {config_file}")
-            backed_up += 1
+    snapshot_id = unique_snapshot_id(f"config-backup-{datetime.now():%Y%m%d-%H%M%S}")
+    try:
+        files = resolve_files(args.sets)
+    except ValueError as e:
+        print_error(f"Invalid backup sets: {e}")
+        sys.exit(1)
     
-    # Create archive
-    if backed_up > 0:
-        archive_path = BACKUP_DIR / f"config-backup-{backup_timestamp}.tar.gz"
-        try:
-            with tarfile.open(archive_path, 'w:gz') as tar:
-                tar.add(backup_path, arcname=backup_path.name)
-            
-            # Remove the temporary directory
-            shutil.rmtree(backup_path)
-            
-            print_success(f"Configuration backup completed: {backed_up} files backed up")
-            print_info(f"Backup archive: {archive_path}")
-            log("INFO", f"Configuration backup: {backed_up} files")
-        except Exception as e:
-            print_warning(f"Could not create archive: {e}")
-            print_info(f"Files backed up to: {backup_path}")
+    if args.incremental:
+        print_info("Backing up system configuration files (incremental)...")
+        backup_incremental(files, snapshot_id)
     else:
-        print_warning("No configuration files were backed up")
-        if backup_path.exists():
-            backup_path.rmdir()
+        print_info("Backing up system configuration files...")
+        backup_archive(files, snapshot_id, args.compress, args.level,
+                       args.threads, args.force)
+    
+    if args.prune:
+        prune_backups(RetentionPolicy(args.hourly, args.daily, args.weekly))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+
+"""
+Backup Retention - Use Case Script
+
+This script prunes old configuration backups:
+- Works from the snapshot index (backups/snapshots.json) that backup_config
+  updates after every run, instead of listing BACKUP_DIR
+- Grandfather-father-son policy: keeps the newest snapshot of each of the
+  last N hours, days and weeks (archives and incremental snapshots are
+  handled separately; the newest of each is always kept)
+- Deletes pruned archives and manifests in one batched pass, then removes
+  store objects no longer referenced by any remaining manifest (every
+  manifest in the store counts, indexed or not)
+- Reports how much space was reclaimed
+
+Usage:
+    python3 backup_retention.py [--hourly N] [--daily N] [--weekly N] [--dry-run]
+
+Author: DevOps Automation Team
+Version: 1.0.0
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # not available on Windows
+    fcntl = None
+
+sys.path.insert(0, str(Path(__file__).parent))
+from common import (
+    init_directories, print_info, print_success, print_warning, log, format_bytes,
+    BACKUP_DIR, BACKUP_INDEX_FILE, BACKUP_KEEP_HOURLY, BACKUP_KEEP_DAILY, BACKUP_KEEP_WEEKLY
+)
+from backup_store import ContentStore
+from fswalk import FileEntry, CleanupStats, walk_files, delete_entries
+
+# Store objects younger than this are never collected: a backup that is
+# still running may have stored them without having written its manifest
+GC_GRACE_SECONDS = 3600
+
+RetentionPolicy = namedtuple('RetentionPolicy', ['hourly', 'daily', 'weekly'])
+
+# Time bucket of a snapshot for each level of the policy
+_BUCKETS = (
+    ('hourly', lambda t: t.strftime('%Y-%m-%d %H')),
+    ('daily', lambda t: t.strftime('%Y-%m-%d')),
+    ('weekly', lambda t: '%04d-W%02d' % t.isocalendar()[:2]),
+)
+
+
+class SnapshotIndex:
+    """
+    Index of backup snapshots.
+
+    Each snapshot is recorded as {'id', 'kind', 'created', 'path', 'size'},
+    where kind is 'archive' (path: archive file) or 'incremental' (path:
+    manifest file). Hold lock() across a load/modify/save cycle.
+    """
+
+    def __init__(self, index_file: Path = BACKUP_INDEX_FILE):
+        self.index_file = index_file
+        self.snapshots = []
+
+    @contextmanager
+    def lock(self):
+        """Hold an exclusive lock on the index (concurrent backups update it)."""
+        self.index_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.index_file.with_name(self.index_file.name + '.lock'), 'a') as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield self
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def load(self) -> 'SnapshotIndex':
+        """Load the index, building it from BACKUP_DIR once if it does not exist yet."""
+        if not self.index_file.exists():
+            self.snapshots = scan_backup_dir(self.index_file.parent)
+            if self.snapshots:
+                self.save()
+            return self
+        with open(self.index_file, 'r') as f:
+            self.snapshots = json.load(f).get('snapshots', [])
+        return self
+
+    def save(self):
+        tmp_file = self.index_file.with_name(self.index_file.name + '.tmp')
+        with open(tmp_file, 'w') as f:
+            json.dump({'snapshots': self.snapshots}, f, indent=1)
+        os.replace(tmp_file, self.index_file)
+
+    def add(self, snapshot_id: str, kind: str, path: Path, created: Optional[datetime] = None):
+        """Record a new snapshot."""
+        created = created or datetime.now()
+        self.snapshots = [s for s in self.snapshots if s['path'] != str(path)]
+        self.snapshots.append({
+            'id': snapshot_id,
+            'kind': kind,
+            'created': created.isoformat(timespec='seconds'),
+            'path': str(path),
+            'size': path.stat().st_size,
+        })
+
+    def remove(self, snapshots: Iterable[dict]):
+        removed = {s['path'] for s in snapshots}
+        self.snapshots = [s for s in self.snapshots if s['path'] not in removed]
+
+
+def scan_backup_dir(backup_dir: Path = BACKUP_DIR) -> List[dict]:
+    """Build index entries from the files in BACKUP_DIR (used once, to create the index)."""
+    snapshots = []
+    candidates = [('archive', path) for path in backup_dir.glob("config-backup-*.tar*")]
+    candidates += [('incremental', path)
+                   for path in ContentStore(backup_dir / "store").list_manifests()]
+    for kind, path in candidates:
+        st = path.stat()
+        snapshot_id = path.name.split('.tar')[0] if kind == 'archive' else path.stem
+        snapshots.append({
+            'id': snapshot_id,
+            'kind': kind,
+            'created': datetime.fromtimestamp(st.st_mtime).isoformat(timespec='seconds'),
+            'path': str(path),
+            'size': st.st_size,
+        })
+    return sorted(snapshots, key=lambda s: s['created'])
+
+
+def record_snapshot(snapshot_id: str, kind: str, path: Path):
+    """Add a snapshot written by backup_config to the index."""
+    index = SnapshotIndex()
+    with index.lock():
+        index.load()
+        index.add(snapshot_id, kind, path)
+        index.save()
+
+
+def select_snapshots(snapshots: List[dict], policy: RetentionPolicy) -> Tuple[List[dict], List[dict]]:
+    """
+    Apply a GFS policy to the snapshots of one kind.
+
+    For each level, the newest snapshot of each of the last N distinct
+    hours/days/weeks is kept. The newest snapshot is always kept.
+    Returns (kept, pruned).
+    """
+    newest_first = sorted(snapshots, key=lambda s: s['created'], reverse=True)
+    keep = set()
+    if newest_first:
+        keep.add(newest_first[0]['path'])
+    for level, bucket_of in _BUCKETS:
+        limit = getattr(policy, level)
+        seen = set()
+        for snapshot in newest_first:
+            if len(seen) >= limit:
+                break
+            bucket = bucket_of(datetime.fromisoformat(snapshot['created']))
+            if bucket not in seen:
+                seen.add(bucket)
+                keep.add(snapshot['path'])
+    kept = [s for s in newest_first if s['path'] in keep]
+    pruned = [s for s in newest_first if s['path'] not in keep]
+    return kept, pruned
+
+
+def _file_entry(path: Path) -> Optional[FileEntry]:
+    try:
+        st = os.lstat(path)
+    except FileNotFoundError:
+        return None
+    return FileEntry(str(path), path.name, st.st_size, st.st_mtime, st.st_ino)
+
+
+def unreferenced_objects(store: ContentStore, manifests: Iterable[dict]) -> List[FileEntry]:
+    """List store objects not referenced by any of the given manifests."""
+    referenced = {entry['sha256'] for manifest in manifests for entry in manifest['files']}
+    cutoff = time.time() - GC_GRACE_SECONDS
+
+    def collectable(entry: FileEntry) -> bool:
+        if entry.name.startswith('.tmp-') or entry.mtime > cutoff:
+            return False
+        digest = os.path.basename(os.path.dirname(entry.path)) + entry.name
+        return digest not in referenced
+
+    return list(walk_files([store.objects_dir], accept=collectable))
+
+
+def _warn_prune_error(path: str, error: OSError):
+    print_warning(f"Cannot remove {path}: {error.strerror or error}")
+
+
+def prune(policy: RetentionPolicy, dry_run: bool = False,
+          index_file: Path = BACKUP_INDEX_FILE) -> Tuple[CleanupStats, int, int]:
+    """
+    Prune snapshots according to a policy.
+
+    Returns (deletion stats, number of pruned snapshots, number of
+    collected store objects). In dry-run mode nothing is deleted and the
+    stats hold what would have been reclaimed.
+    """
+    index = SnapshotIndex(index_file)
+    store = ContentStore(index_file.parent / "store")
+
+    with index.lock():
+        index.load()
+        pruned = []
+        for kind in ('archive', 'incremental'):
+            _, kind_pruned = select_snapshots([s for s in index.snapshots if s['kind'] == kind],
+                                              policy)
+            pruned.extend(kind_pruned)
+        pruned_paths = {os.path.abspath(s['path']) for s in pruned}
+
+        # Every manifest on disk keeps its objects, not only the indexed ones:
+        # a manifest whose index entry was lost must still be restorable
+        remaining_manifests = []
+        for manifest_path in store.list_manifests():
+            if os.path.abspath(manifest_path) in pruned_paths:
+                continue
+            try:
+                remaining_manifests.append(store.load_manifest(manifest_path))
+            except (OSError, ValueError) as e:
+                print_warning(f"Cannot read manifest {manifest_path}: {e}")
+                # Without it we cannot know which objects are still needed
+                remaining_manifests = None
+                break
+
+        targets = [entry for entry in (_file_entry(Path(s['path'])) for s in pruned) if entry]
+        objects = []
+        if remaining_manifests is not None and store.objects_dir.exists():
+            objects = unreferenced_objects(store, remaining_manifests)
+        targets.extend(objects)
+
+        if dry_run:
+            stats = CleanupStats()
+            stats.add(len(targets), sum(entry.size for entry in targets), 0)
+            return stats, len(pruned), len(objects)
+
+        # Update the index first: a crash then leaves unindexed files behind
+        # rather than index entries pointing at deleted snapshots
+        index.remove(pruned)
+        index.save()
+    stats = delete_entries(targets, on_error=_warn_prune_error)
+    return stats, len(pruned), len(objects)
+
+
+def parse_args(argv=None):
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Prune old configuration backups")
+    add_policy_arguments(parser)
+    parser.add_argument('--dry-run', action='store_true',
+                        help="only report what would be removed")
+    return parser.parse_args(argv)
+
+
+def add_policy_arguments(parser: argparse.ArgumentParser):
+    """Add the --hourly/--daily/--weekly retention options to an argument parser."""
+    parser.add_argument('--hourly', type=int, default=BACKUP_KEEP_HOURLY, metavar='N',
+                        help=f"hourly snapshots to keep (default: {BACKUP_KEEP_HOURLY})")
+    parser.add_argument('--daily', type=int, default=BACKUP_KEEP_DAILY, metavar='N',
+                        help=f"daily snapshots to keep (default: {BACKUP_KEEP_DAILY})")
+    parser.add_argument('--weekly', type=int, default=BACKUP_KEEP_WEEKLY, metavar='N',
+                        help=f"weekly snapshots to keep (default: {BACKUP_KEEP_WEEKLY})")
+
+
+def prune_backups(policy: RetentionPolicy, dry_run: bool = False):
+    """Prune backups and print a summary."""
+    print_info(f"Pruning backups (keep {policy.hourly} hourly, {policy.daily} daily, "
+               f"{policy.weekly} weekly)...")
+    stats, snapshots, objects = prune(policy, dry_run)
+    if dry_run:
+        print_info(f"Would remove {snapshots} snapshots and {objects} store objects, "
+                   f"reclaiming {format_bytes(stats.bytes)}")
+        return
+    if stats.errors:
+        print_warning(f"{stats.errors} files could not be removed")
+    print_success(f"Pruned {snapshots} snapshots and {objects} store objects, "
+                  f"reclaimed {format_bytes(stats.bytes)}")
+    log("INFO", f"Backup pruning: {snapshots} snapshots, {objects} objects, "
+                f"{stats.bytes} bytes reclaimed")
+
+
+def main():
+    """Main function."""
+    args = parse_args()
+    init_directories()
+    prune_backups(RetentionPolicy(args.hourly, args.daily, args.weekly), args.dry_run)
+
+
+if __name__ == "__main__":
+    main()
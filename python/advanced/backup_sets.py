@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+
+"""
+Backup Sets and Change Detection
+
+This module decides which files backup_config backs up:
+- A backup set is a named list of include and exclude globs. '*' and '?'
+  match within one path component, '**' matches across directories, and a
+  plain directory path includes its whole tree
+- Sets are read from backup_sets.json when it exists, otherwise
+  DEFAULT_BACKUP_SETS is used
+- ChangeDetector compares the stat signature (size, mtime_ns, inode) of each
+  file with the previous run's manifest, so unchanged files are recognised
+  without reading their contents
+
+backup_sets.json:
+
+    {
+      "system": {"include": ["/etc/hosts", "/etc/fstab"]},
+      "nginx": {"include": ["/etc/nginx/**"], "exclude": ["**/*.bak"]}
+    }
+
+Usage:
+    sets = load_backup_sets()
+    files = resolve_backup_sets(sets)
+    changes = ChangeDetector(previous_manifest['files']).compare(files)
+"""
+
+import json
+import os
+import re
+import stat
+import sys
+from collections import namedtuple
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).parent))
+from common import BACKUP_SETS_FILE
+
+# Used when no backup_sets.json exists
+DEFAULT_BACKUP_SETS = {
+    'system': {
+        'include': ['/etc/hosts', '/etc/resolv.conf', '/etc/fstab', '/etc/crontab', '/etc/cron.d'],
+    },
+    'ssh': {
+        'include': ['/etc/ssh/sshd_config', '/etc/ssh/sshd_config.d'],
+    },
+    'nginx': {
+        'include': ['/etc/nginx/**'],
+        'exclude': ['**/*.bak', '**/*~'],
+    },
+    'apache': {
+        'include': ['/etc/apache2/**'],
+        'exclude': ['**/*.bak', '**/*~'],
+    },
+    'systemd': {
+        'include': ['/etc/systemd/**'],
+    },
+    'docker': {
+        'include': ['/etc/docker/daemon.json'],
+    },
+}
+
+BackupSet = namedtuple('BackupSet', ['name', 'include', 'exclude'])
+
+# Result of comparing the current files with the previous manifest
+Changes = namedtuple('Changes', ['unchanged', 'modified', 'added', 'removed'])
+
+_GLOB_CHARS = re.compile(r'[*?\[]')
+
+
+def glob_to_regex(pattern: str):
+    """Compile a path glob ('*', '?', '[...]' and '**') into a regular expression."""
+    i = 0
+    n = len(pattern)
+    out = []
+    while i < n:
+        if pattern.startswith('**', i):
+            i += 2
+            if i < n and pattern[i] == '/':
+                # '**/' matches zero or more directories
+                out.append('(?:.*/)?')
+                i += 1
+            else:
+                out.append('.*')
+            continue
+        c = pattern[i]
+        if c == '*':
+            out.append('[^/]*')
+        elif c == '?':
+            out.append('[^/]')
+        elif c == '[':
+            end = pattern.find(']', i + 2)
+            if end == -1:
+                out.append(re.escape(c))
+            else:
+                body = pattern[i + 1:end]
+                if body.startswith('!'):
+                    body = '^' + body[1:]
+                out.append('[' + body.replace('\\', '\\\\') + ']')
+                i = end
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return re.compile(''.join(out) + r'\Z')
+
+
+def glob_base(pattern: str) -> str:
+    """Return the directory (or file) part of a glob that contains no wildcards."""
+    parts = pattern.split('/')
+    static = []
+    for part in parts:
+        if _GLOB_CHARS.search(part):
+            break
+        static.append(part)
+    return '/'.join(static) or '/'
+
+
+def load_backup_sets(sets_file: Path = BACKUP_SETS_FILE) -> List[BackupSet]:
+    """
+    Load backup sets from a JSON file, or the defaults if it does not exist.
+
+    Raises ValueError if the file is not a valid backup set definition.
+    """
+    if sets_file.exists():
+        try:
+            with open(sets_file, 'r') as f:
+                definitions = json.load(f)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"{sets_file}: {e}")
+    else:
+        definitions = DEFAULT_BACKUP_SETS
+
+    if not isinstance(definitions, dict):
+        raise ValueError(f"{sets_file}: expected an object of named backup sets")
+    backup_sets = []
+    for name, definition in definitions.items():
+        include = definition.get('include') if isinstance(definition, dict) else None
+        if not include or not isinstance(include, list):
+            raise ValueError(f"Backup set '{name}' needs a list of include globs")
+        exclude = definition.get('exclude', [])
+        for pattern in include:
+            if not pattern.startswith('/'):
+                raise ValueError(f"Backup set '{name}': include '{pattern}' must be an absolute path")
+        backup_sets.append(BackupSet(name, list(include), list(exclude)))
+    return backup_sets
+
+
+def _walk_tree(root: str, on_error: Optional[Callable]) -> Iterator[Tuple[str, os.stat_result]]:
+    """Yield (path, lstat) for the regular files below root, without following symlinks."""
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif entry.is_file(follow_symlinks=False):
+                            yield entry.path, entry.stat(follow_symlinks=False)
+                    except OSError as e:
+                        if on_error is not None:
+                            on_error(entry.path, e)
+        except OSError as e:
+            if on_error is not None:
+                on_error(directory, e)
+
+
+def _match_include(pattern: str, on_error: Optional[Callable]) -> Iterator[Tuple[str, os.stat_result]]:
+    base = glob_base(pattern)
+    try:
+        # Symlinks named in the pattern itself are followed (e.g. /etc/resolv.conf)
+        st = os.stat(base)
+    except FileNotFoundError:
+        return
+    except OSError as e:
+        if on_error is not None:
+            on_error(base, e)
+        return
+
+    if stat.S_ISREG(st.st_mode):
+        if base == pattern:
+            yield base, st
+        return
+    if not stat.S_ISDIR(st.st_mode):
+        return
+    if base == pattern.rstrip('/'):
+        # A plain directory includes its whole tree
+        pattern = base.rstrip('/') + '/**'
+    regex = glob_to_regex(pattern)
+    for path, file_stat in _walk_tree(base, on_error):
+        if regex.match(path):
+            yield path, file_stat
+
+
+def resolve_backup_sets(backup_sets: Iterable[BackupSet],
+                        on_error: Optional[Callable[[str, OSError], None]] = None
+                        ) -> Dict[str, os.stat_result]:
+    """
+    Resolve backup sets into the regular files they cover.
+
+    Returns {path: lstat result}, sorted by path. Each file is listed once,
+    even if several sets include it.
+    """
+    files = {}
+    for backup_set in backup_sets:
+        excludes = [glob_to_regex(pattern) for pattern in backup_set.exclude]
+        for pattern in backup_set.include:
+            for path, st in _match_include(pattern, on_error):
+                if path in files or any(regex.match(path) for regex in excludes):
+                    continue
+                files[path] = st
+    return dict(sorted(files.items()))
+
+
+def signature(st: os.stat_result) -> Tuple[int, int, int]:
+    """Stat signature used to detect changed files."""
+    return st.st_size, st.st_mtime_ns, st.st_ino
+
+
+class ChangeDetector:
+    """Compares current files with the entries of the previous manifest."""
+
+    def __init__(self, previous_entries: Iterable[dict] = ()):
+        self.previous = {entry['path']: entry for entry in previous_entries}
+
+    def unchanged_entry(self, path: str, st: os.stat_result) -> Optional[dict]:
+        """Return the previous manifest entry of a file if its signature is unchanged."""
+        entry = self.previous.get(path)
+        if entry is None:
+            return None
+        if (entry['size'], entry['mtime_ns'], entry['inode']) != signature(st):
+            return None
+        return entry
+
+    def compare(self, files: Dict[str, os.stat_result]) -> Changes:
+        """Classify the current files against the previous manifest."""
+        unchanged = []
+        modified = []
+        added = []
+        for path, st in files.items():
+            if path not in self.previous:
+                added.append(path)
+            elif self.unchanged_entry(path, st) is None:
+                modified.append(path)
+            else:
+                unchanged.append(path)
+        removed = sorted(set(self.previous) - set(files))
+        return Changes(unchanged, modified, added, removed)
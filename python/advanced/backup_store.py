@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+
+"""
+Content-Addressed Backup Store
+
+This module implements incremental backups for backup_config:
+- Each file's content is stored once under its SHA-256 digest
+- Every backup run writes a small JSON manifest that maps source paths
+  to digests and file metadata
+- Runs where nothing changed only add a manifest; no content is copied
+
+Layout under BACKUP_DIR:
+
+    store/objects/ab/cdef0123...    file contents, named by SHA-256 digest
+    store/manifests/config-backup-<timestamp>.json
+
+Usage:
+    store = ContentStore()
+    entry = store.put_file(Path("/etc/hosts"))
+    store.write_manifest("config-backup-20240115-103045", [entry])
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+sys.path.insert(0, str(Path(__file__).parent))
+from common import BACKUP_DIR
+
+STORE_DIR = BACKUP_DIR / "store"
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def file_entry(path: Path, digest: str, st: os.stat_result) -> dict:
+    """Build the manifest entry of a stored file."""
+    return {
+        'path': str(path),
+        'sha256': digest,
+        'size': st.st_size,
+        'mode': st.st_mode & 0o7777,
+        'uid': st.st_uid,
+        'gid': st.st_gid,
+        'mtime_ns': st.st_mtime_ns,
+        'inode': st.st_ino,
+    }
+
+
+def _manifest_order(path: Path):
+    # Ids are timestamps, with a _N suffix for runs within the same second
+    base, _, suffix = path.stem.partition('_')
+    return base, int(suffix) if suffix.isdigit() else 0
+
+
+class ContentStore:
+    """Stores file contents by digest and backup runs as manifests."""
+
+    def __init__(self, root: Path = STORE_DIR):
+        self.root = root
+        self.objects_dir = root / "objects"
+        self.manifests_dir = root / "manifests"
+
+    def init(self):
+        """Create the store directories."""
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+        self.manifests_dir.mkdir(parents=True, exist_ok=True)
+
+    def object_path(self, digest: str) -> Path:
+        return self.objects_dir / digest[:2] / digest[2:]
+
+    def has_object(self, digest: str) -> bool:
+        return self.object_path(digest).exists()
+
+    def put_file(self, path: Path, digest: Optional[str] = None,
+                 st: Optional[os.stat_result] = None) -> dict:
+        """
+        Add a file to the store and return its manifest entry.
+
+        The file is hashed while it is copied to a temporary object, which
+        is then renamed to the digest it was found to have, so the stored
+        bytes always match their name even if the file changes meanwhile.
+        When the content is already stored, the copy is discarded.
+
+        A caller that already knows the file's digest and stat result (from
+        a previous manifest) can pass both: if the object exists, the file
+        is not read at all.
+        """
+        if digest is not None and st is not None and self.has_object(digest):
+            entry = file_entry(path, digest, st)
+            entry['new'] = False
+            return entry
+
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=self.objects_dir, prefix='.tmp-')
+        try:
+            hasher = hashlib.sha256()
+            size = 0
+            with os.fdopen(fd, 'wb') as out, open(path, 'rb') as src:
+                # Describe the file as it was opened, not as an earlier stat saw it
+                st = os.fstat(src.fileno())
+                while True:
+                    chunk = src.read(HASH_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    hasher.update(chunk)
+                    out.write(chunk)
+                    size += len(chunk)
+            digest = hasher.hexdigest()
+            target = self.object_path(digest)
+            new = not target.exists()
+            if new:
+                target.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(tmp_name, target)
+            else:
+                os.unlink(tmp_name)
+        except BaseException:
+            if os.path.exists(tmp_name):
+                os.unlink(tmp_name)
+            raise
+        entry = file_entry(path, digest, st)
+        entry['size'] = size
+        entry['new'] = new
+        return entry
+
+    def write_manifest(self, snapshot_id: str, entries: Iterable[dict]) -> Path:
+        """Write the manifest of a backup run (FileExistsError if the id is taken)."""
+        files = sorted(
+            ({key: value for key, value in entry.items() if key != 'new'} for entry in entries),
+            key=lambda e: e['path']
+        )
+        manifest = {
+            'id': snapshot_id,
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'files': files,
+        }
+        manifest_path = self.manifests_dir / f"{snapshot_id}.json"
+        fd, tmp_name = tempfile.mkstemp(dir=self.manifests_dir, prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(manifest, f, separators=(',', ':'))
+            # link() fails instead of replacing a manifest of the same id
+            os.link(tmp_name, manifest_path)
+        finally:
+            os.unlink(tmp_name)
+        return manifest_path
+
+    def list_manifests(self) -> List[Path]:
+        """List manifest files, oldest first."""
+        if not self.manifests_dir.exists():
+            return []
+        return sorted(self.manifests_dir.glob("*.json"), key=_manifest_order)
+
+    def load_manifest(self, manifest_path: Path) -> dict:
+        with open(manifest_path, 'r') as f:
+            return json.load(f)
+
+    def latest_manifest(self) -> Optional[dict]:
+        """Load the most recent manifest, if any."""
+        manifests = self.list_manifests()
+        return self.load_manifest(manifests[-1]) if manifests else None
+
+    def restore(self, manifest: dict, dest_dir: Path) -> int:
+        """Restore the files of a manifest below dest_dir (keeping their full paths)."""
+        restored = 0
+        for entry in manifest['files']:
+            target = dest_dir / entry['path'].lstrip('/')
+            target.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(self.object_path(entry['sha256']), target)
+            os.chmod(target, entry['mode'])
+            os.utime(target, ns=(entry['mtime_ns'], entry['mtime_ns']))
+            restored += 1
+        return restored
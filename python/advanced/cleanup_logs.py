@@ -10,71 +10,108 @@ This script automates log management tasks:
 - Reports space freed
 
 Usage:
-    python3 cleanup_logs.py
+    python3 cleanup_logs.py [--plan [INDEX] | --apply INDEX]
 
 Author: DevOps Automation Team
 Version: 1.0.0
 """
 
+import argparse
 import os
 import subprocess
 import sys
-from datetime import datetime, timedelta
+import time
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent))
 from common import (
-    init_directories, print_info, print_success, print_warning,
-    log, MAX_LOG_AGE_DAYS
+    init_directories, print_info, print_success, print_warning, print_error,
+    log, format_bytes, MAX_LOG_AGE_DAYS
 )
+from fswalk import walk_files, outermost_roots
+from cleanup_plan import add_plan_arguments, write_plan, apply_plan, read_plan_header
+
+# Common log directories
+LOG_DIRS = [
+    Path("/var/log"),
+    Path("/var/log/apache2"),
+    Path("/var/log/nginx"),
+    Path(os.path.expanduser("~/.local/share/logs")),
+]
+
+
+def _warn_unreadable(path, error):
+    print_warning(f"Could not read {path}: {error}")
+
+
+def find_old_logs(log_dirs, max_age_days: int):
+    """Stream old log files found under the given directories."""
+    cutoff = time.time() - max_age_days * 86400
+    return walk_files(log_dirs, pattern="*.log*",
+                      accept=lambda entry: entry.mtime < cutoff, on_error=_warn_unreadable)
 
 
 def cleanup_old_logs(log_dir: Path, max_age_days: int):
     """Clean up old log files in a directory."""
     cleaned_count = 0
     total_freed = 0
-    cutoff_date = datetime.now() - timedelta(days=max_age_days)
     
     if not log_dir.exists():
         return cleaned_count, total_freed
     
     print_info(f"Processing logs in: {log_dir}")
     
-    for log_file in log_dir.rglob("*.log*"):
-        if log_file.is_file():
-            try:
-                # Get modification time
-                mtime = datetime.fromtimestamp(log_file.stat().st_mtime)
-                if mtime < cutoff_date:
-                    file_size = log_file.stat().st_size
-                    print_info(f"Removing old log: {log_file.name}")
-                    log_file.unlink()
-                    cleaned_count += 1
-                    total_freed += file_size
-            except (OSError, PermissionError) as e:
-                print_warning(f"Could not remove {log_file}: {e}")
+    # The walker streams old files while it is still scanning other subtrees
+    for entry in find_old_logs([log_dir], max_age_days):
+        try:
+            print_info(f"Removing old log: {entry.name}")
+            os.unlink(entry.path)
+            cleaned_count += 1
+            total_freed += entry.size
+        except (OSError, PermissionError) as e:
+            print_warning(f"Could not remove {entry.path}: {e}")
     
     return cleaned_count, total_freed
 
 
 def main():
     """Main function."""
+    parser = argparse.ArgumentParser(description="Rotate and clean old log files")
+    add_plan_arguments(parser, 'cleanup-logs')
+    args = parser.parse_args()
     init_directories()
     
+    # Nested directories (e.g. /var/log/nginx) are covered by their parent
+    log_roots = outermost_roots(d for d in LOG_DIRS if d.is_dir())
+    
+    if args.plan:
+        print_info("Planning log cleanup (nothing will be deleted)...")
+        count, planned_bytes = write_plan(args.plan, find_old_logs(log_roots, MAX_LOG_AGE_DAYS),
+                                          'cleanup-logs', log_roots)
+        print_success(f"Planned {count} old log files ({format_bytes(planned_bytes)}). Index: {args.plan}")
+        log("INFO", f"Log cleanup plan: {count} files, index {args.plan}")
+        return
+    
+    if args.apply:
+        try:
+            header = read_plan_header(args.apply, 'cleanup-logs')
+        except (OSError, ValueError) as e:
+            print_error(f"Cannot apply plan: {e}")
+            sys.exit(1)
+        print_info(f"Applying log cleanup plan from {header['created']}...")
+        stats, skipped = apply_plan(args.apply, 'cleanup-logs', on_error=_warn_unreadable)
+        print_success(f"Log cleanup completed: {stats.files} files removed, "
+                      f"{format_bytes(stats.bytes)} freed, {skipped} changed files skipped")
+        log("INFO", f"Log cleanup (plan {args.apply}): {stats.files} files removed, "
+                    f"{skipped} skipped")
+        return
+    
     print_info("Starting log cleanup and rotation...")
     
     cleaned_count = 0
     total_freed = 0
     
-    # Common log directories
-    log_dirs = [
-        Path("/var/log"),
-        Path("/var/log/apache2"),
-        Path("/var/log/nginx"),
-        Path(os.path.expanduser("~/.local/share/logs")),
-    ]
-    
-    for log_dir in log_dirs:
+    for log_dir in log_roots:
         if log_dir.exists() and log_dir.is_dir():
             count, freed = cleanup_old_logs(log_dir, MAX_LOG_AGE_DAYS)
             cleaned_count += count
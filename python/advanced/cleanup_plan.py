@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+
+"""
+Cleanup Plan Index
+
+This module lets the cleanup tools split a run into two steps:
+- Plan: walk the filesystem once and write a compact index of candidate
+  files (path, size, mtime, inode) without deleting anything
+- Apply: delete the files listed in an index, after a cheap re-validation
+  stat that skips files that were changed or replaced since planning
+
+Index file format (all integers little-endian):
+
+    b"LSMPLAN1"                     magic
+    uint32 header length + JSON     tool name, creation time, roots
+    records until end of file:
+        uint64 inode, uint64 size, float64 mtime, uint16 path length, path bytes
+
+Usage:
+    python3 cleanup_logs.py --plan reports/logs.idx
+    python3 cleanup_logs.py --apply reports/logs.idx
+"""
+
+import argparse
+import json
+import os
+import stat
+import struct
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).parent))
+from common import REPORT_DIR
+from fswalk import FileEntry, CleanupStats, delete_entries
+
+PLAN_MAGIC = b"LSMPLAN1"
+_HEADER_LEN = struct.Struct('<I')
+_RECORD = struct.Struct('<QQdH')
+
+
+def write_plan(plan_file: Path, entries: Iterable[FileEntry], tool: str,
+               roots: Iterable[Path]) -> Tuple[int, int]:
+    """
+    Write candidate files to an index file.
+
+    Records are streamed to a temporary file that is renamed into place
+    once complete. Returns (number of files, total bytes).
+    """
+    count = 0
+    total_bytes = 0
+    header = json.dumps({
+        'tool': tool,
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'roots': [str(root) for root in roots],
+    }).encode()
+
+    tmp_file = plan_file.with_name(plan_file.name + '.tmp')
+    try:
+        with open(tmp_file, 'wb') as f:
+            f.write(PLAN_MAGIC)
+            f.write(_HEADER_LEN.pack(len(header)))
+            f.write(header)
+            for entry in entries:
+                path_bytes = os.fsencode(entry.path)
+                f.write(_RECORD.pack(entry.inode, entry.size, entry.mtime, len(path_bytes)))
+                f.write(path_bytes)
+                count += 1
+                total_bytes += entry.size
+        os.replace(tmp_file, plan_file)
+    except BaseException:
+        # Do not leave a partial index behind (e.g. disk full, interrupted walk)
+        if tmp_file.exists():
+            tmp_file.unlink()
+        raise
+    return count, total_bytes
+
+
+def add_plan_arguments(parser: argparse.ArgumentParser, tool: str):
+    """Add the --plan and --apply options to a cleanup tool's argument parser."""
+    default_plan = REPORT_DIR / f"{tool}-plan.idx"
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument('--plan', nargs='?', const=default_plan, type=Path, metavar='INDEX',
+                       help=f"only write an index of files to delete (default: {default_plan})")
+    group.add_argument('--apply', type=Path, metavar='INDEX',
+                       help="delete the files listed in an index written by --plan")
+
+
+def read_plan_header(plan_file: Path, tool: Optional[str] = None) -> dict:
+    """
+    Read the JSON header of an index file.
+
+    With a tool name, raise ValueError unless the index was written by
+    that tool, so one tool never deletes the files another one planned.
+    """
+    with open(plan_file, 'rb') as f:
+        header = _read_header(f)
+    if tool is not None and header.get('tool') != tool:
+        raise ValueError(f"{plan_file} was written by {header.get('tool') or 'an unknown tool'}, "
+                         f"not {tool}")
+    return header
+
+
+def _read_header(f) -> dict:
+    if f.read(len(PLAN_MAGIC)) != PLAN_MAGIC:
+        raise ValueError(f"{f.name} is not a cleanup plan index")
+    (length,) = _HEADER_LEN.unpack(f.read(_HEADER_LEN.size))
+    return json.loads(f.read(length).decode())
+
+
+def read_plan(plan_file: Path) -> Iterator[FileEntry]:
+    """Yield the FileEntry records stored in an index file."""
+    with open(plan_file, 'rb') as f:
+        _read_header(f)
+        while True:
+            record = f.read(_RECORD.size)
+            if not record:
+                return
+            if len(record) < _RECORD.size:
+                raise ValueError(f"{plan_file} is truncated")
+            inode, size, mtime, path_len = _RECORD.unpack(record)
+            path = os.fsdecode(f.read(path_len))
+            yield FileEntry(path, os.path.basename(path), size, mtime, inode)
+
+
+def apply_plan(plan_file: Path, tool: str,
+               on_error: Optional[Callable[[str, OSError], None]] = None) -> Tuple[CleanupStats, int]:
+    """
+    Delete the files listed in an index written by `tool`.
+
+    An index of another tool is rejected with ValueError before anything
+    is deleted.
+
+    Each file is re-validated with one lstat: it is only deleted if it is
+    still a regular file with the same inode, size and mtime as when the
+    plan was made. Returns (deletion stats, number of skipped files).
+    """
+    read_plan_header(plan_file, tool)
+    skipped = [0]
+
+    def still_valid(entries):
+        for entry in entries:
+            try:
+                st = os.lstat(entry.path)
+            except OSError:
+                skipped[0] += 1
+                continue
+            if (stat.S_ISREG(st.st_mode) and st.st_ino == entry.inode and
+                    st.st_size == entry.size and st.st_mtime == entry.mtime):
+                yield entry
+            else:
+                skipped[0] += 1
+
+    stats = delete_entries(still_valid(read_plan(plan_file)), on_error=on_error)
+    return stats, skipped[0]
@@ -7,11 +7,16 @@ This module contains shared functions and configuration used by all
 system management scripts.
 """
 
+import atexit
 import os
+import queue
 import sys
+import threading
+import time
+from concurrent.futures import Future, wait, FIRST_COMPLETED
 from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Dict, Optional, Tuple
 
 # Color codes for output
 RED = '\033[0;31m'
@@ -24,7 +29,13 @@ NC = '\033[0m'  # No Color
 SCRIPT_DIR = Path(__file__).parent.absolute()
 LOG_DIR = SCRIPT_DIR / "logs"
 REPORT_DIR = SCRIPT_DIR / "reports"
+# Time-series store of health check samples (see metrics_store.py)
+METRICS_DIR = REPORT_DIR / "metrics"
 BACKUP_DIR = SCRIPT_DIR / "backups"
+# Optional definition of the backup sets used by backup_config
+BACKUP_SETS_FILE = SCRIPT_DIR / "backup_sets.json"
+# Index of all backup snapshots (archives and incremental manifests)
+BACKUP_INDEX_FILE = BACKUP_DIR / "snapshots.json"
 
 # Thresholds
 MAX_LOG_AGE_DAYS = 30
@@ -32,6 +43,61 @@ DISK_USAGE_THRESHOLD = 80
 MEMORY_USAGE_THRESHOLD = 85
 CPU_USAGE_THRESHOLD = 80
 
+# Log writer: size-based rotation (in addition to the daily log file),
+# number of rotated files kept, and how often/when buffered lines are flushed
+LOG_MAX_BYTES = 10 * 1024 * 1024
+LOG_BACKUP_COUNT = 5
+LOG_FLUSH_INTERVAL = 1.0
+LOG_BUFFER_LINES = 1000
+
+# Concurrent collection: worker pool size, per-collector timeout and
+# overall deadline (seconds) for reports that run several collectors
+COLLECTOR_MAX_WORKERS = 8
+COLLECTOR_TIMEOUT = 15
+REPORT_DEADLINE = 20
+
+# Daemon mode: collection intervals (seconds) and state file
+DAEMON_HEALTH_INTERVAL = 60
+DAEMON_SERVICE_INTERVAL = 300
+DAEMON_AUDIT_INTERVAL = 3600
+DAEMON_STATE_FILE = REPORT_DIR / "daemon-state.json"
+
+# Network connectivity checks: (name, host, port) targets, connect timeout
+# (seconds) and connection attempts per target. LSM_NETWORK_TARGETS
+# overrides the targets, e.g. "db=10.0.0.5:5432,api.internal:443".
+NETWORK_TARGETS = [
+    ('Google DNS', '8.8.8.8', 53),
+    ('Cloudflare DNS', '1.1.1.1', 53),
+]
+NETWORK_TIMEOUT = 2.0
+NETWORK_PROBES = 3
+NETWORK_MAX_CONCURRENCY = 100
+
+# Prometheus metrics endpoint: listen address and how long (seconds) a
+# collection is served from cache before scrapes trigger a new one
+METRICS_EXPORTER_HOST = "0.0.0.0"
+METRICS_EXPORTER_PORT = 9120
+METRICS_CACHE_TTL = 5.0
+
+# Backup retention (grandfather-father-son): newest snapshot kept per hour/day/week
+BACKUP_KEEP_HOURLY = 24
+BACKUP_KEEP_DAILY = 7
+BACKUP_KEEP_WEEKLY = 4
+
+# Stream used for human-readable console messages. Structured output
+# written to stdout moves these messages to stderr (see console_to_stderr).
+_console = None
+
+
+def _console_stream():
+    return _console if _console is not None else sys.stdout
+
+
+def console_to_stderr():
+    """Send info/success/warning and log messages to stderr instead of stdout."""
+    global _console
+    _console = sys.stderr
+
 
 def init_directories():
     """Initialize required directories."""
@@ -40,33 +106,216 @@ def init_directories():
     BACKUP_DIR.mkdir(exist_ok=True)
 
 
+class BufferedLogWriter:
+    """
+    Buffered, non-blocking writer for the daily log files.
+
+    Lines are appended to an in-memory buffer and written in batches by a
+    background thread through a persistent file handle. Log files rotate
+    daily (one file per date) and when they grow beyond `max_bytes`.
+    Buffered lines are flushed at exit; lines logged after close() are
+    appended directly. A forked child starts with its own empty buffer,
+    locks and flush thread.
+    """
+
+    def __init__(self, log_dir: Path = LOG_DIR, max_bytes: int = LOG_MAX_BYTES,
+                 backup_count: int = LOG_BACKUP_COUNT,
+                 flush_interval: float = LOG_FLUSH_INTERVAL,
+                 buffer_lines: int = LOG_BUFFER_LINES):
+        self.log_dir = log_dir
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.flush_interval = flush_interval
+        self.buffer_lines = buffer_lines
+        self._buffer = []
+        self._cond = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._file = None
+        self._file_date = None
+        self._closed = False
+        self._start_thread()
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(before=self._before_fork,
+                                after_in_parent=self._after_fork_in_parent,
+                                after_in_child=self._after_fork_in_child)
+
+    def _start_thread(self):
+        self._pid = os.getpid()
+        self._thread = threading.Thread(target=self._run, name="lsm-log-writer", daemon=True)
+        self._thread.start()
+
+    def _before_fork(self):
+        # Hold both locks so no thread is halfway through a write at the fork,
+        # and empty the file object's buffer so the child cannot write it again
+        self._write_lock.acquire()
+        self._cond.acquire()
+        if self._file is not None:
+            self._file.flush()
+
+    def _after_fork_in_parent(self):
+        self._cond.release()
+        self._write_lock.release()
+
+    def _after_fork_in_child(self):
+        # The parent still owns (and will write) the buffered lines
+        self._buffer = []
+        self._cond = threading.Condition()
+        self._write_lock = threading.Lock()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self._closed:
+            self._pid = os.getpid()
+        else:
+            self._start_thread()
+
+    def log_file(self, date: str) -> Path:
+        return self.log_dir / f"system-manager-{date}.log"
+
+    def write(self, date: str, line: str):
+        """Queue a line for the log file of the given date (YYYY-MM-DD)."""
+        with self._cond:
+            if not self._closed:
+                self._buffer.append((date, line))
+                if len(self._buffer) >= self.buffer_lines:
+                    self._cond.notify()
+                return
+        # After close() (e.g. from other atexit handlers): no flush thread left
+        with self._write_lock:
+            self._write_lines(date, [line])
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if not self._buffer and not self._closed:
+                    self._cond.wait(self.flush_interval)
+                if self._closed and not self._buffer:
+                    return
+            self.flush()
+
+    def flush(self):
+        """Write all buffered lines to disk."""
+        with self._write_lock:
+            with self._cond:
+                pending, self._buffer = self._buffer, []
+            if not pending:
+                return
+
+            chunk = []
+            chunk_date = pending[0][0]
+            for date, line in pending:
+                if date != chunk_date:
+                    self._write_lines(chunk_date, chunk)
+                    chunk, chunk_date = [], date
+                chunk.append(line)
+            self._write_lines(chunk_date, chunk)
+            if self._file is not None:
+                self._file.flush()
+
+    def _write_lines(self, date: str, lines: list):
+        try:
+            if self._file is None or date != self._file_date:
+                self._open(date)
+            size = self._file.tell()
+            batch = []
+            for line in lines:
+                # max_bytes is a file size: count encoded bytes, not characters
+                length = len(line.encode('utf-8'))
+                if size > 0 and size + length > self.max_bytes:
+                    self._file.write(''.join(batch))
+                    self._rotate(date)
+                    size, batch = 0, []
+                batch.append(line)
+                size += length
+            self._file.write(''.join(batch))
+        except OSError as e:
+            print(f"{RED}[ERROR]{NC} Could not write log file: {e}", file=sys.stderr)
+
+    def _open(self, date: str):
+        if self._file is not None:
+            self._file.close()
+        self.log_dir.mkdir(exist_ok=True)
+        self._file = open(self.log_file(date), 'a', encoding='utf-8')
+        self._file_date = date
+
+    def _rotate(self, date: str):
+        """Rotate a log file that has reached max_bytes (.1 is the newest)."""
+        self._file.close()
+        self._file = None
+        base = self.log_file(date)
+        for index in range(self.backup_count - 1, 0, -1):
+            older = base.with_name(f"{base.name}.{index}")
+            if older.exists():
+                os.replace(older, base.with_name(f"{base.name}.{index + 1}"))
+        if self.backup_count > 0:
+            os.replace(base, base.with_name(f"{base.name}.1"))
+        else:
+            base.unlink()
+        self._open(date)
+
+    def close(self):
+        """Flush remaining lines and stop the background thread."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        if self._thread.is_alive() and os.getpid() == self._pid:
+            self._thread.join(timeout=5)
+        self.flush()
+        with self._write_lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+_log_writer = None
+_log_writer_lock = threading.Lock()
+
+
+def get_log_writer() -> BufferedLogWriter:
+    """Get the shared log writer, creating it on first use."""
+    global _log_writer
+    with _log_writer_lock:
+        if _log_writer is None:
+            _log_writer = BufferedLogWriter()
+            atexit.register(_log_writer.close)
+        return _log_writer
+
+
+def flush_logs():
+    """Write buffered log lines to disk now."""
+    if _log_writer is not None:
+        _log_writer.flush()
+
+
 def log(level: str, message: str):
     """Log a message to the log file with timestamp."""
-    timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    log_file = LOG_DIR / f"system-manager-{datetime.now().strftime('%Y-%m-%d')}.log"
+    now = datetime.now()
+    timestamp = now.strftime('%Y-%m-%d %H:%M:%S')
     
     log_entry = f"[{timestamp}] [{level}] {message}\n"
     
-    with open(log_file, 'a') as f:
-        f.write(log_entry)
+    get_log_writer().write(now.strftime('%Y-%m-%d'), log_entry)
     
-    # Also print to stdout
-    print(log_entry.strip())
+    # Also print to the console
+    print(log_entry.strip(), file=_console_stream())
 
 
 def print_info(message: str):
     """Print info message with blue color."""
-    print(f"{BLUE}[INFO]{NC} {message}")
+    print(f"{BLUE}[INFO]{NC} {message}", file=_console_stream())
 
 
 def print_success(message: str):
     """Print success message with green color."""
-    print(f"{GREEN}[SUCCESS]{NC} {message}")
+    print(f"{GREEN}[SUCCESS]{NC} {message}", file=_console_stream())
 
 
 def print_warning(message: str):
     """Print warning message with yellow color."""
-    print(f"{YELLOW}[WARNING]{NC} {message}")
+    print(f"{YELLOW}[WARNING]{NC} {message}", file=_console_stream())
 
 
 def print_error(message: str):
@@ -91,5 +340,89 @@ def format_bytes(bytes_value: int) -> str:
     return f"{bytes_value:.2f}PB"
 
 
+def run_collectors(collectors: Dict[str, Callable], max_workers: int = COLLECTOR_MAX_WORKERS,
+                   timeout: float = COLLECTOR_TIMEOUT,
+                   deadline: float = REPORT_DEADLINE) -> Tuple[Dict, Dict]:
+    """
+    Run independent collector functions in a bounded thread pool.
+
+    Each collector gets `timeout` seconds from the moment it starts, and all
+    of them must finish within `deadline` seconds overall. Returns a tuple
+    (results, missing): results maps collector name to its return value,
+    missing maps the name of every collector that failed or did not finish
+    in time to a short reason.
+
+    Collectors run on daemon threads: one that misses its timeout or the
+    deadline keeps running in the background with its result discarded,
+    but it does not keep the process alive once the caller is done.
+    """
+    results = {}
+    missing = {}
+    started_at = {}
+    global_deadline = time.monotonic() + deadline
+
+    def _timed(name, func):
+        started_at[name] = time.monotonic()
+        return func()
+
+    # Not a ThreadPoolExecutor: interpreter exit joins its (non-daemon) workers,
+    # so a stuck collector would hold up the process past the deadline
+    jobs = queue.Queue()
+    futures = {}
+    for name, func in collectors.items():
+        future = Future()
+        futures[future] = name
+        jobs.put((future, name, func))
+
+    def _worker():
+        while True:
+            try:
+                future, name, func = jobs.get_nowait()
+            except queue.Empty:
+                return
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(_timed(name, func))
+            except BaseException as e:
+                future.set_exception(e)
+
+    for _ in range(min(max_workers, len(collectors))):
+        threading.Thread(target=_worker, name="lsm-collector", daemon=True).start()
+    pending = set(futures)
+
+    while pending:
+        now = time.monotonic()
+        # Drop collectors that have run past their own timeout
+        for future in list(pending):
+            name = futures[future]
+            if name in started_at and now - started_at[name] >= timeout and not future.done():
+                missing[name] = f"timed out after {timeout:g}s"
+                pending.discard(future)
+        if not pending or now >= global_deadline:
+            break
+
+        wake_at = global_deadline
+        for future in pending:
+            name = futures[future]
+            if name in started_at:
+                wake_at = min(wake_at, started_at[name] + timeout)
+        # Queued collectors have no start time yet; re-check periodically
+        done, pending = wait(pending, timeout=max(0.0, min(wake_at - now, 0.5)),
+                             return_when=FIRST_COMPLETED)
+        for future in done:
+            name = futures[future]
+            try:
+                results[name] = future.result()
+            except Exception as e:
+                missing[name] = f"failed: {e}"
 
+    for future in pending:
+        name = futures[future]
+        if future.done() and not future.cancelled() and future.exception() is None:
+            results[name] = future.result()
+            continue
+        future.cancel()
+        missing[name] = f"missed the {deadline:g}s report deadline"
 
+    return results, missing
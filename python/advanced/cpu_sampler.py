@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+
+"""
+CPU Sampling Engine
+
+This module computes CPU utilisation from deltas between /proc/stat reads:
+- Keeps the previous counters in memory between calls
+- Reports overall, per-core and per-mode (user/system/iowait/steal/...) usage
+- Shares one sampler per process so several consumers (health_check,
+  full_report, monitoring loops) reuse a sample instead of re-sampling
+
+Usage:
+    from cpu_sampler import get_sampler
+    usage = get_sampler().sample()
+    print(usage['total'], usage['modes']['iowait'], usage['per_core'])
+"""
+
+import threading
+import time
+from typing import Dict, Optional
+
+import procfs
+
+# Minimum time between two /proc/stat reads (seconds). Calls made within
+# this interval of the previous sample return the cached result.
+DEFAULT_INTERVAL = 0.5
+
+# Counters older than this are considered stale: the next sample re-primes
+# instead of reporting an average over a very long window.
+DEFAULT_MAX_WINDOW = 60.0
+
+# Modes reported in the per-mode breakdown
+MODES = ('user', 'nice', 'system', 'idle', 'iowait', 'irq', 'softirq', 'steal')
+
+
+def _percentages(before: Dict[str, int], after: Dict[str, int]) -> Dict[str, float]:
+    """Compute total and per-mode utilisation between two counter sets."""
+    deltas = {mode: max(0, after[mode] - before[mode]) for mode in MODES}
+    delta_total = sum(deltas.values())
+    if delta_total <= 0:
+        usage = {mode: 0.0 for mode in MODES}
+        usage['total'] = 0.0
+        return usage
+
+    usage = {mode: deltas[mode] / delta_total * 100 for mode in MODES}
+    usage['total'] = 100 - usage['idle'] - usage['iowait']
+    return usage
+
+
+class CpuSampler:
+    """Delta-based CPU sampler backed by /proc/stat."""
+
+    def __init__(self, interval: float = DEFAULT_INTERVAL,
+                 max_window: float = DEFAULT_MAX_WINDOW):
+        self.interval = interval
+        self.max_window = max_window
+        self._lock = threading.Lock()
+        self._prev_times = None
+        self._prev_at = 0.0
+        self._last_result = None
+
+    def _read(self):
+        times = procfs.read_cpu_times()
+        return times, time.monotonic()
+
+    def sample(self) -> Optional[Dict]:
+        """
+        Get CPU utilisation since the previous sample.
+
+        Returns a dict with:
+            'total'    - overall busy percentage
+            'modes'    - percentage per mode (user, system, iowait, steal, ...)
+            'per_core' - {'cpu0': {'total': ..., 'user': ..., ...}, ...}
+            'window'   - length of the measured window in seconds
+        or None if /proc/stat cannot be read.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if self._last_result is not None and now - self._prev_at < self.interval:
+                return self._last_result
+
+            if self._prev_times is None or now - self._prev_at > self.max_window:
+                self._prev_times, self._prev_at = self._read()
+                if self._prev_times is None:
+                    return None
+                time.sleep(self.interval)
+
+            times, read_at = self._read()
+            if times is None:
+                return None
+
+            per_core = {}
+            for name, counters in times.items():
+                if name == 'cpu' or name not in self._prev_times:
+                    continue
+                core_usage = _percentages(self._prev_times[name], counters)
+                per_core[name] = core_usage
+
+            overall = _percentages(self._prev_times['cpu'], times['cpu'])
+            result = {
+                'total': overall.pop('total'),
+                'modes': overall,
+                'per_core': per_core,
+                'window': read_at - self._prev_at,
+            }
+
+            self._prev_times, self._prev_at = times, read_at
+            self._last_result = result
+            return result
+
+    def get_usage(self) -> Optional[float]:
+        """Get overall CPU usage percentage."""
+        result = self.sample()
+        return result['total'] if result else None
+
+
+_shared_sampler = None
+_shared_lock = threading.Lock()
+
+
+def get_sampler(interval: Optional[float] = None,
+                max_window: Optional[float] = None) -> CpuSampler:
+    """
+    Get the process-wide shared sampler.
+
+    The interval and max_window are only applied when they are given; the
+    first caller creates the sampler with DEFAULT_INTERVAL and
+    DEFAULT_MAX_WINDOW otherwise.
+    """
+    global _shared_sampler
+    with _shared_lock:
+        if _shared_sampler is None:
+            _shared_sampler = CpuSampler(
+                interval if interval is not None else DEFAULT_INTERVAL,
+                max_window if max_window is not None else DEFAULT_MAX_WINDOW,
+            )
+        else:
+            if interval is not None:
+                _shared_sampler.interval = interval
+            if max_window is not None:
+                _shared_sampler.max_window = max_window
+        return _shared_sampler
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+
+"""
+Monitoring Daemon - Use Case Script
+
+This script keeps the collectors resident in one long-running process:
+- Runs health checks, service checks and user audits on independent intervals
+- Keeps the latest result of each check in memory
+- Publishes the latest results to a JSON state file for other tools
+- Appends every health sample to the metrics store
+- Stops cleanly on SIGINT/SIGTERM
+
+The daemon runs in the foreground and does not detach: start it under
+systemd (Type=simple) or with nohup to keep it running after logout.
+
+Usage:
+    python3 daemon.py [--health-interval SEC] [--service-interval SEC]
+                      [--audit-interval SEC] [--once]
+    python3 daemon.py status
+
+Author: DevOps Automation Team
+Version: 1.0.0
+"""
+
+import argparse
+import json
+import os
+import signal
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from common import (
+    init_directories, print_info, print_success, print_warning, print_error,
+    log, DAEMON_HEALTH_INTERVAL, DAEMON_SERVICE_INTERVAL, DAEMON_AUDIT_INTERVAL,
+    DAEMON_STATE_FILE
+)
+
+
+class MonitorDaemon:
+    """Runs collectors on independent intervals and keeps their latest results."""
+
+    def __init__(self, state_file: Path = DAEMON_STATE_FILE):
+        self.state_file = state_file
+        self.jobs = {}
+        self._results = {}
+        self._lock = threading.Lock()
+        # Job threads finish at the same time: one state file write at a time
+        self._state_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads = []
+
+    def add_job(self, name: str, collector, interval: float):
+        """Register a collector to run every `interval` seconds."""
+        self.jobs[name] = (collector, interval)
+
+    def latest(self, name: str = None):
+        """Get the latest result of one job, or of all jobs."""
+        with self._lock:
+            if name is None:
+                return dict(self._results)
+            return self._results.get(name)
+
+    def run_job(self, name: str):
+        """Run a single job now and store its result."""
+        collector, interval = self.jobs[name]
+        started = time.monotonic()
+        entry = {
+            'collected_at': datetime.now().isoformat(timespec='seconds'),
+            'interval': interval,
+        }
+        try:
+            entry['data'] = collector()
+            entry['ok'] = True
+        except Exception as e:
+            entry['data'] = None
+            entry['ok'] = False
+            entry['error'] = str(e)
+            log("ERROR", f"Daemon job {name} failed: {e}")
+        entry['duration'] = round(time.monotonic() - started, 3)
+
+        with self._lock:
+            self._results[name] = entry
+        self.write_state()
+
+    def write_state(self):
+        """Atomically write the latest results to the state file."""
+        with self._state_lock:
+            state = {
+                'pid': os.getpid(),
+                'updated_at': datetime.now().isoformat(timespec='seconds'),
+                'results': self.latest(),
+            }
+            tmp_file = self.state_file.with_name(self.state_file.name + '.tmp')
+            try:
+                with open(tmp_file, 'w') as f:
+                    json.dump(state, f, indent=2, default=str)
+                os.replace(tmp_file, self.state_file)
+            except OSError as e:
+                print_warning(f"Could not write daemon state: {e}")
+
+    def _job_loop(self, name: str):
+        _, interval = self.jobs[name]
+        while not self._stop.is_set():
+            self.run_job(name)
+            self._stop.wait(interval)
+
+    def start(self):
+        """Start one scheduler thread per job."""
+        for name in self.jobs:
+            thread = threading.Thread(target=self._job_loop, args=(name,),
+                                      name=f"lsm-{name}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, *_):
+        """Ask all job threads to stop after their current run."""
+        self._stop.set()
+
+    def wait(self):
+        """Block until stop() is called."""
+        while not self._stop.is_set():
+            self._stop.wait(1)
+        for thread in self._threads:
+            thread.join(timeout=5)
+
+
+def build_daemon(health_interval: float, service_interval: float,
+                 audit_interval: float) -> MonitorDaemon:
+    """Create a daemon with the standard health, service and audit jobs."""
+    from cpu_sampler import get_sampler, DEFAULT_MAX_WINDOW
+    from health_check import collect_and_record_health
+    from service_status import collect_services
+    from user_audit import collect_audit
+
+    # Health runs are health_interval plus their own run time apart: keep the
+    # CPU counters valid across that gap so no run has to re-prime and wait
+    get_sampler(max_window=max(DEFAULT_MAX_WINDOW, health_interval * 2))
+
+    daemon = MonitorDaemon()
+    daemon.add_job('health', collect_and_record_health, health_interval)
+    daemon.add_job('services', collect_services, service_interval)
+    daemon.add_job('audit', collect_audit, audit_interval)
+    return daemon
+
+
+def show_status(state_file: Path = DAEMON_STATE_FILE) -> int:
+    """Print the latest results published by a running daemon."""
+    try:
+        with open(state_file, 'r') as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        print_error(f"No daemon state found at {state_file}")
+        return 1
+
+    print_info(f"Daemon PID {state['pid']}, last update {state['updated_at']}")
+    for name, entry in sorted(state['results'].items()):
+        status = "OK" if entry['ok'] else f"FAILED ({entry.get('error')})"
+        print(f"  {name:<10} {entry['collected_at']}  every {entry['interval']}s  "
+              f"{entry['duration']}s  {status}")
+    print(json.dumps(state['results'], indent=2))
+    return 0
+
+
+def parse_args(argv=None):
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Long-running monitoring daemon")
+    parser.add_argument('action', nargs='?', choices=['run', 'status'], default='run',
+                        help="run the daemon in the foreground (default) or show the latest results")
+    parser.add_argument('--health-interval', type=float, default=DAEMON_HEALTH_INTERVAL,
+                        help="seconds between health checks")
+    parser.add_argument('--service-interval', type=float, default=DAEMON_SERVICE_INTERVAL,
+                        help="seconds between service checks")
+    parser.add_argument('--audit-interval', type=float, default=DAEMON_AUDIT_INTERVAL,
+                        help="seconds between user audits")
+    parser.add_argument('--once', action='store_true',
+                        help="run every job once, write the state file and exit")
+    return parser.parse_args(argv)
+
+
+def main():
+    """Main function."""
+    args = parse_args()
+    init_directories()
+
+    if args.action == 'status':
+        sys.exit(show_status())
+
+    daemon = build_daemon(args.health_interval, args.service_interval, args.audit_interval)
+
+    if args.once:
+        for name in daemon.jobs:
+            daemon.run_job(name)
+        print_success(f"Collected {len(daemon.jobs)} jobs. State saved to: {daemon.state_file}")
+        return
+
+    signal.signal(signal.SIGTERM, daemon.stop)
+    signal.signal(signal.SIGINT, daemon.stop)
+
+    print_info(f"Starting monitoring daemon (PID {os.getpid()})...")
+    log("INFO", "Monitoring daemon started")
+    daemon.start()
+    daemon.wait()
+    print_success("Monitoring daemon stopped")
+    log("INFO", "Monitoring daemon stopped")
+
+
+if __name__ == "__main__":
+    main()
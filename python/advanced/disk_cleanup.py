@@ -10,7 +10,7 @@ This script automates disk space cleanup:
 - Reports cleanup statistics
 
 Usage:
-    python3 disk_cleanup.py
+    python3 disk_cleanup.py [--plan [INDEX] | --apply INDEX]
 
 Note: Some operations may require root privileges
 
@@ -18,14 +18,28 @@ Author: DevOps Automation Team
 Version: 1.0.0
 """
 
+import argparse
 import os
 import subprocess
 import sys
-from datetime import datetime, timedelta
+import time
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent))
-from common import init_directories, print_info, print_success, print_warning, log, check_root
+from common import (
+    init_directories, print_info, print_success, print_warning, print_error, log, check_root,
+    format_bytes
+)
+from fswalk import walk_files, delete_entries, outermost_roots
+from cleanup_plan import add_plan_arguments, write_plan, apply_plan, read_plan_header
+
+# Temporary directories and the age after which their files are removed
+TEMP_DIRS = [
+    Path("/tmp"),
+    Path("/var/tmp"),
+    Path(os.path.expanduser("~/.cache")),
+]
+TEMP_FILE_MAX_AGE_DAYS = 7
 
 
 def clean_package_cache():
@@ -58,37 +72,41 @@ def clean_package_cache():
             continue
 
 
+def _warn_cleanup_error(path, error):
+    if not isinstance(error, PermissionError):
+        print_warning(f"Could not clean {path}: {error}")
+
+
+def temp_roots():
+    """Get the existing temporary directories, without nested duplicates."""
+    return outermost_roots(d for d in TEMP_DIRS if d.is_dir())
+
+
+def find_old_temp_files(temp_dirs):
+    """Stream temporary files older than TEMP_FILE_MAX_AGE_DAYS."""
+    cutoff = time.time() - TEMP_FILE_MAX_AGE_DAYS * 86400
+    return walk_files(temp_dirs, accept=lambda entry: entry.mtime < cutoff,
+                      on_error=_warn_cleanup_error)
+
+
+def report_throughput(stats, location):
+    """Print how many files were removed and how fast."""
+    if stats.files > 0:
+        print_info(
+            f"Removed {stats.files} old files ({format_bytes(stats.bytes)}) from {location} "
+            f"in {stats.elapsed:.1f}s: {stats.files_per_second:.0f} files/s, "
+            f"{format_bytes(stats.bytes_per_second)}/s"
+        )
+
+
 def clean_temp_files():
     """Clean old temporary files."""
     print_info("Cleaning temporary files...")
-    temp_dirs = [
-        Path("/tmp"),
-        Path("/var/tmp"),
-        Path(os.path.expanduser("~/.cache")),
-    ]
-    
-    cutoff_date = datetime.now() - timedelta(days=7)
     
-    for temp_dir in temp_dirs:
-        if temp_dir.exists() and temp_dir.is_dir():
-            try:
-                files_before = sum(1 for f in temp_dir.rglob('*') if f.is_file())
-                removed = 0
-                
-                for file_path in temp_dir.rglob('*'):
-                    if file_path.is_file():
-                        try:
-                            mtime = datetime.fromtimestamp(file_path.stat().st_mtime)
-                            if mtime < cutoff_date:
-                                file_path.unlink()
-                                removed += 1
-                        except (OSError, PermissionError):
-                            pass
-                
-                if removed > 0:
-                    print_info(f"Removed {removed} old files from {temp_dir}")
-            except (OSError, PermissionError) as e:
-                print_warning(f"Could not clean {temp_dir}: {e}")
+    for temp_dir in temp_roots():
+        # One walk per tree: old files are deleted in batches while the walk continues
+        stats = delete_entries(find_old_temp_files([temp_dir]), on_error=_warn_cleanup_error)
+        report_throughput(stats, temp_dir)
 
 
 def clean_docker():
@@ -112,8 +130,38 @@ def clean_docker():
 
 def main():
     """Main function."""
+    parser = argparse.ArgumentParser(description="Clean up disk space")
+    add_plan_arguments(parser, 'disk-cleanup')
+    args = parser.parse_args()
     init_directories()
     
+    # Plan/apply only cover temporary files; package caches and Docker
+    # are cleaned by their own tools in a normal run
+    if args.plan:
+        print_info("Planning temporary file cleanup (nothing will be deleted)...")
+        roots = temp_roots()
+        count, planned_bytes = write_plan(args.plan, find_old_temp_files(roots),
+                                          'disk-cleanup', roots)
+        print_success(f"Planned {count} old temporary files ({format_bytes(planned_bytes)}). "
+                      f"Index: {args.plan}")
+        log("INFO", f"Disk cleanup plan: {count} files, index {args.plan}")
+        return
+    
+    if args.apply:
+        try:
+            header = read_plan_header(args.apply, 'disk-cleanup')
+        except (OSError, ValueError) as e:
+            print_error(f"Cannot apply plan: {e}")
+            sys.exit(1)
+        print_info(f"Applying disk cleanup plan from {header['created']}...")
+        stats, skipped = apply_plan(args.apply, 'disk-cleanup', on_error=_warn_cleanup_error)
+        report_throughput(stats, args.apply)
+        print_success(f"Disk cleanup completed: {stats.files} files removed, "
+                      f"{skipped} changed files skipped")
+        log("INFO", f"Disk cleanup (plan {args.apply}): {stats.files} files removed, "
+                    f"{skipped} skipped")
+        return
+    
     print_info("Starting disk cleanup operation...")
     
     clean_package_cache()
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+
+"""
+Parallel Filesystem Walker
+
+This module walks and cleans directory trees for the cleanup tools:
+- File type and stat data come from a single scandir/lstat per entry
+- Independent subtrees are split across worker threads
+- Matching files are yielded as a stream, so callers can start deleting
+  before the walk has finished
+- Symbolic links are never followed
+- delete_entries() removes a stream of files in batches and reports throughput
+
+Usage:
+    from fswalk import walk_files
+    for entry in walk_files([Path("/var/log")], pattern="*.log*"):
+        print(entry.path, entry.size, entry.mtime)
+"""
+
+import os
+import queue
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from fnmatch import fnmatch
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, Optional
+
+# Default number of walker threads
+WALK_WORKERS = 4
+
+# Files removed per deletion batch, and threads removing batches
+DELETE_BATCH_SIZE = 500
+DELETE_WORKERS = 2
+
+# A regular file found by the walker
+FileEntry = namedtuple('FileEntry', ['path', 'name', 'size', 'mtime', 'inode'])
+
+_DONE = object()
+
+
+def outermost_roots(roots: Iterable[Path]) -> list:
+    """Drop roots that are nested inside another root (they would be walked twice)."""
+    resolved = sorted({Path(os.path.abspath(root)) for root in roots}, key=lambda p: len(p.parts))
+    outermost = []
+    for root in resolved:
+        if not any(parent == root or parent in root.parents for parent in outermost):
+            outermost.append(root)
+    return outermost
+
+
+def _scan_directory(directory: str, pattern: Optional[str], accept: Optional[Callable],
+                    on_error: Optional[Callable]):
+    """
+    Scan one directory.
+
+    Returns (matching file entries, subdirectories to walk).
+    """
+    files = []
+    subdirs = []
+    try:
+        with os.scandir(directory) as it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.path)
+                        continue
+                    if not entry.is_file(follow_symlinks=False):
+                        continue
+                    if pattern is not None and not fnmatch(entry.name, pattern):
+                        continue
+                    st = entry.stat(follow_symlinks=False)
+                except OSError as e:
+                    if on_error is not None:
+                        on_error(entry.path, e)
+                    continue
+                file_entry = FileEntry(entry.path, entry.name, st.st_size, st.st_mtime, st.st_ino)
+                if accept is None or accept(file_entry):
+                    files.append(file_entry)
+    except OSError as e:
+        if on_error is not None:
+            on_error(directory, e)
+    return files, subdirs
+
+
+def walk_files(roots: Iterable[Path], pattern: Optional[str] = None,
+               accept: Optional[Callable[[FileEntry], bool]] = None,
+               workers: int = WALK_WORKERS,
+               on_error: Optional[Callable[[str, OSError], None]] = None) -> Iterator[FileEntry]:
+    """
+    Walk directory trees and yield regular files as FileEntry tuples.
+
+    Args:
+        roots: directories to walk
+        pattern: optional fnmatch pattern applied to file names
+        accept: optional filter called with each FileEntry (e.g. an age check)
+        workers: number of threads scanning directories in parallel
+        on_error: optional callback for directories/files that cannot be read
+
+    The order of the yielded entries is not defined.
+    """
+    # Subtrees are independent, so a shared work queue of directories lets
+    # idle threads pick up any pending subtree.
+    directories = queue.Queue()
+    # Files are passed to the consumer one directory batch at a time
+    results = queue.Queue(maxsize=256)
+    pending = [0]
+    pending_lock = threading.Lock()
+    stop = threading.Event()
+
+    seen_roots = set()
+    for root in roots:
+        root = os.fspath(root)
+        if root in seen_roots or not os.path.isdir(root):
+            continue
+        seen_roots.add(root)
+        pending[0] += 1
+        directories.put(root)
+
+    if not pending[0]:
+        return
+
+    def put_result(item):
+        # Give up once the consumer has stopped reading
+        while not stop.is_set():
+            try:
+                results.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def worker():
+        while True:
+            directory = directories.get()
+            if directory is _DONE:
+                return
+            if not stop.is_set():
+                files, subdirs = _scan_directory(directory, pattern, accept, on_error)
+                with pending_lock:
+                    pending[0] += len(subdirs)
+                for subdir in subdirs:
+                    directories.put(subdir)
+                if files:
+                    put_result(files)
+            with pending_lock:
+                pending[0] -= 1
+                finished = pending[0] == 0
+            if finished:
+                put_result(_DONE)
+
+    threads = [threading.Thread(target=worker, name=f"fswalk-{i}", daemon=True)
+               for i in range(max(1, workers))]
+    for thread in threads:
+        thread.start()
+
+    try:
+        while True:
+            batch = results.get()
+            if batch is _DONE:
+                break
+            yield from batch
+    finally:
+        # Consumer finished early or the walk is complete: stop the workers
+        stop.set()
+        for _ in threads:
+            directories.put(_DONE)
+
+
+class CleanupStats:
+    """Counters and throughput of a deletion run."""
+
+    def __init__(self):
+        self.files = 0
+        self.bytes = 0
+        self.errors = 0
+        self.started = time.monotonic()
+        self.elapsed = 0.0
+
+    def add(self, files: int, freed: int, errors: int):
+        self.files += files
+        self.bytes += freed
+        self.errors += errors
+
+    @property
+    def files_per_second(self) -> float:
+        return self.files / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def bytes_per_second(self) -> float:
+        return self.bytes / self.elapsed if self.elapsed > 0 else 0.0
+
+
+def _delete_batch(batch: list, on_error: Optional[Callable]):
+    removed = freed = errors = 0
+    for entry in batch:
+        try:
+            os.unlink(entry.path)
+            removed += 1
+            freed += entry.size
+        except FileNotFoundError:
+            # Already gone, e.g. removed by the application itself
+            pass
+        except OSError as e:
+            errors += 1
+            if on_error is not None:
+                on_error(entry.path, e)
+    return removed, freed, errors
+
+
+def delete_entries(entries: Iterable[FileEntry], batch_size: int = DELETE_BATCH_SIZE,
+                   workers: int = DELETE_WORKERS,
+                   on_error: Optional[Callable[[str, OSError], None]] = None) -> CleanupStats:
+    """
+    Delete a stream of files in batches.
+
+    Batches are handed to a small thread pool as soon as they are full, so
+    deletion overlaps with the walk producing the entries. At most two
+    batches per worker are in flight at any time.
+    """
+    stats = CleanupStats()
+    in_flight = []
+
+    def collect(block: bool):
+        while in_flight and (block or in_flight[0].done()):
+            stats.add(*in_flight.pop(0).result())
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        batch = []
+        for entry in entries:
+            batch.append(entry)
+            if len(batch) >= batch_size:
+                if len(in_flight) >= 2 * workers:
+                    stats.add(*in_flight.pop(0).result())
+                in_flight.append(executor.submit(_delete_batch, batch, on_error))
+                batch = []
+                collect(block=False)
+        if batch:
+            in_flight.append(executor.submit(_delete_batch, batch, on_error))
+        collect(block=True)
+
+    stats.elapsed = time.monotonic() - stats.started
+    return stats
@@ -11,7 +11,7 @@ This script generates a comprehensive system report:
 - System load and recent events
 
 Usage:
-    python3 full_report.py
+    python3 full_report.py [--format text|ndjson|json] [--output PATH|-]
 
 Author: DevOps Automation Team
 Version: 1.0.0
@@ -27,9 +27,10 @@ from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent))
 from common import (
-    init_directories, print_info, print_success, log, REPORT_DIR,
-    format_bytes
+    init_directories, print_info, print_success, print_warning, log, REPORT_DIR,
+    format_bytes, run_collectors
 )
+from report_output import parse_output_args, run_structured
 
 
 def get_system_info():
@@ -126,26 +127,145 @@ def get_network_info():
     return None
 
 
+def get_uptime():
+    """Get system uptime as reported by the uptime command."""
+    try:
+        uptime_result = subprocess.run(
+            ['uptime'],
+            capture_output=True,
+            text=True,
+            timeout=2
+        )
+        if uptime_result.returncode == 0:
+            return uptime_result.stdout.strip()
+    except (FileNotFoundError, subprocess.TimeoutExpired):
+        pass
+    return None
+
+
+def parse_process_lines(lines: list) -> list:
+    """Parse 'ps aux' output lines (header first) into dictionaries."""
+    processes = []
+    for line in lines[1:]:
+        parts = line.split(None, 10)
+        if len(parts) < 11:
+            continue
+        processes.append({
+            'user': parts[0],
+            'pid': int(parts[1]),
+            'cpu': float(parts[2]),
+            'mem': float(parts[3]),
+            'command': parts[10],
+        })
+    return processes
+
+
+def emit_report(writer, system_info: dict, results: dict, missing: dict):
+    """Write the collected report data as structured records."""
+    for key, value in system_info.items():
+        writer.metric('system', key, value)
+
+    sections = [
+        ('cpu', ('cpu_usage', 'cpu_breakdown')),
+        ('memory', ('mem_info',)),
+        ('disk', ('disk_info',)),
+        ('load', ('load_avg',)),
+        ('network', ('network_info',)),
+        ('processes', ('top_processes',)),
+        ('packages', ('package_counts',)),
+        ('uptime', ('uptime',)),
+    ]
+    for section, names in sections:
+        for name in names:
+            if name in missing:
+                writer.partial(section, f"{name}: {missing[name]}")
+
+        if section == 'cpu':
+            if results.get('cpu_usage') is not None:
+                writer.metric('cpu', 'usage', round(results['cpu_usage'], 2), 'percent')
+            if results.get('cpu_breakdown'):
+                for mode, value in results['cpu_breakdown']['modes'].items():
+                    writer.metric('cpu', f"mode_{mode}", round(value, 2), 'percent')
+                writer.metric('cpu', 'cores', len(results['cpu_breakdown']['per_core']))
+        elif section == 'memory' and results.get('mem_info'):
+            mem_info = results['mem_info']
+            writer.metric('memory', 'total', mem_info['total'], 'bytes')
+            writer.metric('memory', 'used', mem_info['used'], 'bytes')
+            writer.metric('memory', 'available', mem_info['free'], 'bytes')
+            writer.metric('memory', 'usage', round(mem_info['percent'], 2), 'percent')
+        elif section == 'disk':
+            for disk in results.get('disk_info') or []:
+                writer.item('disk', disk, name=disk['mount_point'])
+        elif section == 'load' and results.get('load_avg'):
+            for period, value in zip(('1min', '5min', '15min'), results['load_avg'][:3]):
+                writer.metric('load', period, float(value))
+        elif section == 'network' and results.get('network_info'):
+            writer.item('network', {'interfaces': results['network_info']})
+        elif section == 'processes' and results.get('top_processes'):
+            for process in parse_process_lines(results['top_processes']):
+                writer.item('processes', process, name=str(process['pid']))
+        elif section == 'packages' and results.get('package_counts'):
+            for pm_name, count in results['package_counts'].items():
+                writer.metric('packages', pm_name, count)
+        elif section == 'uptime' and results.get('uptime'):
+            writer.metric('uptime', 'uptime', results['uptime'])
+
+
 def main():
     """Main function."""
+    args = parse_output_args("Comprehensive system report")
     init_directories()
     
     print_info("Generating comprehensive system report...")
     report_file = REPORT_DIR / f"full-report-{datetime.now().strftime('%Y%m%d-%H%M%S')}.txt"
     
     system_info = get_system_info()
-    top_processes = get_top_processes()
-    package_counts = get_package_count()
-    network_info = get_network_info()
     
     # Import other modules for their functions
-    from health_check import get_disk_usage, get_load_average, get_memory_info, get_cpu_usage
+    from health_check import (
+        get_disk_usage, get_load_average, get_memory_info, get_cpu_usage,
+        get_cpu_breakdown, format_cpu_modes
+    )
+    
+    # Run the independent collectors in parallel so a slow one
+    # (e.g. 'dpkg -l') does not hold up the rest of the report
+    results, missing = run_collectors({
+        'top_processes': get_top_processes,
+        'package_counts': get_package_count,
+        'network_info': get_network_info,
+        'cpu_usage': get_cpu_usage,
+        'cpu_breakdown': get_cpu_breakdown,
+        'mem_info': get_memory_info,
+        'disk_info': get_disk_usage,
+        'load_avg': get_load_average,
+        'uptime': get_uptime,
+    })
+    for name, reason in missing.items():
+        print_warning(f"Collector {name} {reason}")
+    
+    if args.format != 'text':
+        destination = run_structured(
+            'full_report', args,
+            lambda writer: emit_report(writer, system_info, results, missing)
+        )
+        print_success(f"Full system report written to: {destination}")
+        log("INFO", f"Full report generated. Records: {destination}")
+        return
+    
+    def write_partial(f, name):
+        """Write a note for a collector that did not return in time."""
+        if name in missing:
+            f.write(f"[PARTIAL] {name}: {missing[name]}\n")
     
     with open(report_file, 'w') as f:
         f.write("=" * 60 + "\n")
         f.write("COMPREHENSIVE SYSTEM REPORT\n")
         f.write("=" * 60 + "\n")
-        f.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
+        f.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+        if missing:
+            f.write(f"Partial report: {len(missing)} collector(s) incomplete "
+                    f"({', '.join(sorted(missing))})\n")
+        f.write("\n")
         
         # System Information
         f.write("--- System Information ---\n")
@@ -158,70 +278,84 @@ def main():
         
         # CPU and Memory
         f.write("--- CPU and Memory ---\n")
-        cpu_usage = get_cpu_usage()
+        cpu_usage = results.get('cpu_usage')
         if cpu_usage is not None:
             f.write(f"CPU Usage: {cpu_usage:.1f}%\n")
+        write_partial(f, 'cpu_usage')
+        cpu_breakdown = results.get('cpu_breakdown')
+        if cpu_breakdown:
+            f.write(format_cpu_modes(cpu_breakdown['modes']) + "\n")
+            f.write(f"Cores: {len(cpu_breakdown['per_core'])}\n")
+        write_partial(f, 'cpu_breakdown')
         
-        mem_info = get_memory_info()
+        mem_info = results.get('mem_info')
         if mem_info:
             f.write(f"Total Memory: {format_bytes(mem_info['total'])}\n")
             f.write(f"Used Memory: {format_bytes(mem_info['used'])}\n")
             f.write(f"Available Memory: {format_bytes(mem_info['free'])}\n")
             f.write(f"Memory Usage: {mem_info['percent']:.2f}%\n")
+        write_partial(f, 'mem_info')
         f.write("\n")
         
         # Disk Usage
         f.write("--- Disk Usage ---\n")
-        disk_info = get_disk_usage()
+        disk_info = results.get('disk_info') or []
         for disk in disk_info:
             f.write(f"{disk['filesystem']:30} {disk['mount_point']:30} {disk['usage']:3}%\n")
+        write_partial(f, 'disk_info')
         f.write("\n")
         
         # Load Average
         f.write("--- Load Average ---\n")
-        load_avg = get_load_average()
+        load_avg = results.get('load_avg')
         if load_avg:
             f.write(f"1min: {load_avg[0]}, 5min: {load_avg[1]}, 15min: {load_avg[2]}\n")
+        write_partial(f, 'load_avg')
         f.write("\n")
         
         # Network Information
         f.write("--- Network Interfaces ---\n")
+        network_info = results.get('network_info')
         if network_info:
             f.write(network_info)
+        elif 'network_info' in missing:
+            write_partial(f, 'network_info')
         else:
             f.write("Unable to retrieve network information\n")
         f.write("\n")
         
         # Top Processes
         f.write("--- Top 10 Processes by CPU ---\n")
+        top_processes = results.get('top_processes')
         if top_processes:
             for process in top_processes:
                 f.write(f"{process}\n")
+        elif 'top_processes' in missing:
+            write_partial(f, 'top_processes')
         else:
             f.write("Unable to retrieve process information\n")
         f.write("\n")
         
         # Package Count
         f.write("--- Installed Packages ---\n")
+        package_counts = results.get('package_counts')
         if package_counts:
             for pm_name, count in package_counts.items():
                 f.write(f"{pm_name.upper()}: {count} packages\n")
+        elif 'package_counts' in missing:
+            write_partial(f, 'package_counts')
         else:
             f.write("Unable to retrieve package information\n")
         f.write("\n")
         
         # Uptime
         f.write("--- System Uptime ---\n")
-        try:
-            uptime_result = subprocess.run(
-                ['uptime'],
-                capture_output=True,
-                text=True,
-                timeout=2
-            )
-            if uptime_result.returncode == 0:
-                f.write(f"{uptime_result.stdout.strip()}\n")
-        except (FileNotFoundError, subprocess.TimeoutExpired):
+        uptime = results.get('uptime')
+        if uptime:
+            f.write(f"{uptime}\n")
+        elif 'uptime' in missing:
+            write_partial(f, 'uptime')
+        else:
             f.write("Unable to retrieve uptime\n")
         f.write("\n")
     
@@ -8,21 +8,24 @@ This script performs a comprehensive system health check including:
 - Memory usage analysis
 - Disk space monitoring
 - Load average checks
-- Network connectivity tests
+- Network connectivity tests (concurrent TCP probes with latency stats)
 - Critical service status
+- Every run appends a sample to the metrics store (see metrics_store.py)
 
 Usage:
-    python3 health_check.py
+    python3 health_check.py [--format text|ndjson|json] [--output PATH|-]
 
 Author: DevOps Automation Team
 Version: 1.0.0
 """
 
+import asyncio
 import os
 import platform
 import subprocess
 import socket
 import sys
+import time
 from datetime import datetime
 from pathlib import Path
 
@@ -31,13 +34,22 @@ sys.path.insert(0, str(Path(__file__).parent))
 from common import (
     init_directories, print_info, print_success, print_warning, print_error,
     log, REPORT_DIR, CPU_USAGE_THRESHOLD, MEMORY_USAGE_THRESHOLD,
-    DISK_USAGE_THRESHOLD
+    DISK_USAGE_THRESHOLD, NETWORK_TARGETS, NETWORK_TIMEOUT, NETWORK_PROBES,
+    NETWORK_MAX_CONCURRENCY
 )
+import procfs
+from cpu_sampler import get_sampler
+from report_output import parse_output_args, run_structured
+from metrics_store import MetricsStore, percentile
 
 
 def get_cpu_usage():
     """Get CPU usage percentage."""
     try:
+        if procfs.is_available():
+            cpu_usage = get_sampler().get_usage()
+            if cpu_usage is not None:
+                return cpu_usage
         if platform.system() == "Darwin":  # macOS
             result = subprocess.run(
                 ["sysctl", "-n", "vm.loadavg"],
@@ -75,9 +87,31 @@ def get_cpu_usage():
     return None
 
 
+def get_cpu_breakdown():
+    """Get per-mode and per-core CPU usage from the shared sampler."""
+    if not procfs.is_available():
+        return None
+    try:
+        return get_sampler().sample()
+    except Exception as e:
+        print_warning(f"Could not determine CPU breakdown: {e}")
+    return None
+
+
+def format_cpu_modes(modes: dict) -> str:
+    """Format the per-mode CPU breakdown as a single report line."""
+    return ("CPU Modes: "
+            f"user {modes['user']:.1f}%, system {modes['system']:.1f}%, "
+            f"iowait {modes['iowait']:.1f}%, steal {modes['steal']:.1f}%")
+
+
 def get_memory_info():
     """Get memory usage information."""
     try:
+        if procfs.is_available():
+            mem_info = procfs.get_memory_info()
+            if mem_info is not None:
+                return mem_info
         if platform.system() == "Darwin":  # macOS
             result = subprocess.run(
                 ["vm_stat"],
@@ -153,6 +187,14 @@ def get_memory_info():
 
 def get_disk_usage():
     """Get disk usage for mounted filesystems."""
+    if procfs.is_available():
+        try:
+            disk_info = procfs.get_disk_usage()
+            if disk_info is not None:
+                return disk_info
+        except Exception as e:
+            print_warning(f"Could not read disk usage from procfs: {e}")
+
     disk_info = []
     try:
         result = subprocess.run(
@@ -179,25 +221,96 @@ def get_disk_usage():
     return disk_info
 
 
-def check_network_connectivity():
-    """Check network connectivity to common hosts."""
-    hosts = [
-        ('Google DNS', '8.8.8.8', 53),
-        ('Cloudflare DNS', '1.1.1.1', 53),
-    ]
-    
-    results = []
-    for name, host, port in hosts:
-        try:
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(2)
-            result = sock.connect_ex((host, port))
-            sock.close()
-            results.append((name, result == 0))
-        except Exception:
-            results.append((name, False))
-    
-    return results
+def network_targets() -> list:
+    """Connectivity targets from LSM_NETWORK_TARGETS ("name=host:port,..."), or NETWORK_TARGETS."""
+    spec = os.environ.get('LSM_NETWORK_TARGETS', '').strip()
+    if not spec:
+        return list(NETWORK_TARGETS)
+    targets = []
+    for item in spec.split(','):
+        item = item.strip()
+        if not item:
+            continue
+        name, _, address = item.rpartition('=')
+        host, _, port = address.rpartition(':')
+        if not host or not port.isdigit():
+            print_warning(f"Ignoring invalid network target: {item}")
+            continue
+        targets.append((name or address, host.strip('[]'), int(port)))
+    return targets
+
+
+async def _probe(host: str, port: int, timeout: float, semaphore) -> float:
+    """Open one TCP connection and return the connect time in seconds."""
+    async with semaphore:
+        started = time.monotonic()
+        _, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+        elapsed = time.monotonic() - started
+        writer.close()
+        return elapsed
+
+
+def _describe_error(error: BaseException) -> str:
+    if isinstance(error, asyncio.TimeoutError):
+        return "timeout"
+    if isinstance(error, OSError) and error.strerror:
+        return error.strerror
+    return str(error) or type(error).__name__
+
+
+async def _check_target(name: str, host: str, port: int, probes: int, timeout: float,
+                        semaphore) -> dict:
+    # All attempts run at once, so an unreachable target costs one timeout
+    outcomes = await asyncio.gather(*(_probe(host, port, timeout, semaphore) for _ in range(probes)),
+                                    return_exceptions=True)
+    latencies = sorted(outcome * 1000 for outcome in outcomes if isinstance(outcome, float))
+    result = {
+        'name': name,
+        'host': host,
+        'port': port,
+        'ok': bool(latencies),
+        'attempts': probes,
+        'successes': len(latencies),
+        'latency_ms': None,
+    }
+    if latencies:
+        result['latency_ms'] = {
+            'min': round(latencies[0], 2),
+            'avg': round(sum(latencies) / len(latencies), 2),
+            'p95': round(percentile(latencies, 95), 2),
+        }
+    else:
+        result['error'] = _describe_error(outcomes[0])
+    return result
+
+
+async def _check_targets(targets: list, probes: int, timeout: float) -> list:
+    semaphore = asyncio.Semaphore(NETWORK_MAX_CONCURRENCY)
+    return await asyncio.gather(*(_check_target(name, host, port, probes, timeout, semaphore)
+                                  for name, host, port in targets))
+
+
+def check_network_connectivity(targets: list = None, probes: int = NETWORK_PROBES,
+                               timeout: float = NETWORK_TIMEOUT) -> list:
+    """
+    Check TCP connectivity to the configured targets.
+
+    All targets, and all connection attempts per target, are probed
+    concurrently, so the check takes about one timeout however many
+    targets are unreachable. Returns one dict per target with 'name',
+    'host', 'port', 'ok', 'attempts', 'successes', 'latency_ms' (min, avg
+    and p95 connect time of the successful attempts) and, when every
+    attempt failed, 'error'.
+    """
+    targets = network_targets() if targets is None else targets
+    if not targets:
+        return []
+    return asyncio.run(_check_targets(targets, max(1, probes), timeout))
+
+
+def format_latency(latency: dict) -> str:
+    """Format connect latency stats as 'min/avg/p95 ms'."""
+    return f"{latency['min']:.1f}/{latency['avg']:.1f}/{latency['p95']:.1f} ms"
 
 
 def get_load_average():
@@ -220,10 +333,129 @@ def get_load_average():
     return None
 
 
+def collect_health() -> dict:
+    """Collect all health check metrics into a dictionary (no report file)."""
+    cpu_breakdown = get_cpu_breakdown()
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'hostname': socket.gethostname(),
+        'cpu': {
+            'usage': get_cpu_usage(),
+            'modes': cpu_breakdown['modes'] if cpu_breakdown else None,
+            'per_core': ({core: usage['total'] for core, usage in cpu_breakdown['per_core'].items()}
+                         if cpu_breakdown else None),
+        },
+        'memory': get_memory_info(),
+        'disks': get_disk_usage(),
+        'load_average': get_load_average(),
+        'network': check_network_connectivity(),
+    }
+
+
+def sample_values(cpu_usage, mem_info, disk_info, load_avg) -> dict:
+    """Reduce collected health data to the values kept in the metrics store."""
+    load = [float(value) for value in load_avg[:3]] if load_avg else [None] * 3
+    return {
+        'cpu': cpu_usage,
+        'memory': mem_info['percent'] if mem_info else None,
+        'disk': max((disk['usage'] for disk in disk_info), default=None) if disk_info else None,
+        'load1': load[0],
+        'load5': load[1],
+        'load15': load[2],
+    }
+
+
+def record_sample(values: dict):
+    """Append a sample to the metrics store; failures only produce a warning."""
+    try:
+        MetricsStore().append(values, time.time())
+    except (OSError, ValueError) as e:
+        print_warning(f"Could not record metrics sample: {e}")
+
+
+def collect_and_record_health() -> dict:
+    """Collect health metrics and append them to the metrics store."""
+    health = collect_health()
+    record_sample(sample_values(health['cpu']['usage'], health['memory'],
+                                health['disks'], health['load_average']))
+    return health
+
+
+def _status(value, threshold) -> str:
+    return 'warning' if value > threshold else 'ok'
+
+
+def emit_health(writer):
+    """Stream health check records, one per metric, as they are collected."""
+    cpu_usage = get_cpu_usage()
+    if cpu_usage is not None:
+        writer.metric('cpu', 'usage', round(cpu_usage, 2), 'percent',
+                      _status(cpu_usage, CPU_USAGE_THRESHOLD))
+    else:
+        writer.partial('cpu', "unable to determine CPU usage")
+    cpu_breakdown = get_cpu_breakdown()
+    if cpu_breakdown:
+        for mode, value in cpu_breakdown['modes'].items():
+            writer.metric('cpu', f"mode_{mode}", round(value, 2), 'percent')
+        for core, usage in cpu_breakdown['per_core'].items():
+            writer.metric('cpu', f"{core}_usage", round(usage['total'], 2), 'percent')
+
+    mem_info = get_memory_info()
+    if mem_info:
+        writer.metric('memory', 'total', mem_info['total'], 'bytes')
+        writer.metric('memory', 'used', mem_info['used'], 'bytes')
+        writer.metric('memory', 'available', mem_info['free'], 'bytes')
+        writer.metric('memory', 'usage', round(mem_info['percent'], 2), 'percent',
+                      _status(mem_info['percent'], MEMORY_USAGE_THRESHOLD))
+    else:
+        writer.partial('memory', "unable to determine memory usage")
+
+    disk_info = get_disk_usage()
+    for disk in disk_info:
+        writer.item('disk', {
+            'filesystem': disk['filesystem'],
+            'mount_point': disk['mount_point'],
+            'usage': disk['usage'],
+            'status': _status(disk['usage'], DISK_USAGE_THRESHOLD),
+        }, name=disk['mount_point'])
+
+    load_avg = get_load_average()
+    if load_avg:
+        for period, value in zip(('1min', '5min', '15min'), load_avg[:3]):
+            writer.metric('load', period, float(value))
+    else:
+        writer.partial('load', "unable to determine load average")
+
+    for target in check_network_connectivity():
+        data = {
+            'target': target['name'],
+            'host': target['host'],
+            'port': target['port'],
+            'ok': target['ok'],
+            'attempts': target['attempts'],
+            'successes': target['successes'],
+        }
+        if target['latency_ms']:
+            for stat, value in target['latency_ms'].items():
+                data[f"latency_{stat}_ms"] = value
+        else:
+            data['error'] = target['error']
+        writer.item('network', data, name=target['name'])
+
+    record_sample(sample_values(cpu_usage, mem_info, disk_info, load_avg))
+
+
 def main():
     """Main function."""
+    args = parse_output_args("Comprehensive system health check")
     init_directories()
     
+    if args.format != 'text':
+        destination = run_structured('health_check', args, emit_health)
+        print_success(f"Health check completed. Records written to: {destination}")
+        log("INFO", f"Health check completed. Records: {destination}")
+        return
+    
     print_info("Starting comprehensive system health check...")
     report_file = REPORT_DIR / f"health-check-{datetime.now().strftime('%Y%m%d-%H%M%S')}.txt"
     
@@ -259,6 +491,11 @@ def main():
                 f.write(f"[SUCCESS] CPU usage is normal: {cpu_usage:.1f}%\n")
         else:
             f.write("CPU Usage: Unable to determine\n")
+        cpu_breakdown = get_cpu_breakdown()
+        if cpu_breakdown:
+            f.write(format_cpu_modes(cpu_breakdown['modes']) + "\n")
+            for core, usage in sorted(cpu_breakdown['per_core'].items(), key=lambda c: int(c[0][3:])):
+                f.write(f"  {core}: {usage['total']:.1f}%\n")
         f.write("\n")
         
         # Memory Usage
@@ -303,16 +540,21 @@ def main():
         
         # Network Connectivity
         f.write("--- Network Connectivity ---\n")
-        network_results = check_network_connectivity()
-        for name, status in network_results:
-            status_str = "OK" if status else "FAIL"
-            f.write(f"{name}: {status_str}\n")
-            if status:
-                print_success(f"Network connectivity to {name}: OK")
+        for target in check_network_connectivity():
+            name = target['name']
+            if target['ok']:
+                latency = format_latency(target['latency_ms'])
+                f.write(f"{name}: OK ({target['host']}:{target['port']}, "
+                        f"connect min/avg/p95 {latency}, "
+                        f"{target['successes']}/{target['attempts']} attempts)\n")
+                print_success(f"Network connectivity to {name}: OK ({latency})")
             else:
-                print_warning(f"Network connectivity to {name}: FAIL")
+                f.write(f"{name}: FAIL ({target['host']}:{target['port']}, {target['error']})\n")
+                print_warning(f"Network connectivity to {name}: FAIL ({target['error']})")
         f.write("\n")
     
+    record_sample(sample_values(cpu_usage, mem_info, disk_info, load_avg))
+    
     print_success(f"Health check completed. Report saved to: {report_file}")
     log("INFO", f"Health check completed. Report: {report_file}")
 
@@ -16,7 +16,11 @@ Commands:
     service-status    - Check status of critical services
     user-audit        - Audit user accounts and permissions
     backup-config     - Backup system configuration files
+    prune-backups     - Remove old backups (keep N hourly/daily/weekly)
     full-report       - Generate comprehensive system report
+    metrics           - Query stored health metrics (e.g. metrics summary memory --since 7d)
+    serve-metrics     - Serve health metrics over HTTP for Prometheus
+    daemon            - Run collectors continuously (daemon status: latest results)
 
 Note: You can also run individual scripts directly:
     python3 health_check.py
@@ -49,12 +53,20 @@ def show_usage():
     print("  service-status    Check status of critical services")
     print("  user-audit        Audit user accounts and permissions")
     print("  backup-config     Backup system configuration files")
+    print("  prune-backups     Remove old backups (keep N hourly/daily/weekly)")
     print("  full-report       Generate comprehensive system report")
+    print("  metrics           Query stored health metrics (summary|series METRIC)")
+    print("  serve-metrics     Serve health metrics over HTTP for Prometheus (/metrics)")
+    print("  daemon            Run collectors continuously in the foreground")
+    print("                    (daemon status: show the latest results)")
     print("")
     print("Examples:")
     print(f"  {script_name} health-check")
     print(f"  {script_name} cleanup-logs")
     print(f"  {script_name} full-report")
+    print(f"  {script_name} daemon --health-interval 60")
+    print(f"  {script_name} metrics summary memory --since 7d")
+    print(f"  {script_name} serve-metrics --port 9120")
     print("")
     print("Note: You can also run individual scripts directly:")
     print("  python3 health_check.py")
@@ -77,7 +89,11 @@ def main():
         'service-status': 'service_status',
         'user-audit': 'user_audit',
         'backup-config': 'backup_config',
+        'prune-backups': 'backup_retention',
         'full-report': 'full_report',
+        'metrics': 'metrics_store',
+        'serve-metrics': 'metrics_exporter',
+        'daemon': 'daemon',
     }
     
     if command not in command_map:
@@ -87,6 +103,8 @@ def main():
     
     # Import and run the corresponding module
     module_name = command_map[command]
+    # Leave only the command's own arguments for the module to parse
+    sys.argv = [f"{Path(sys.argv[0]).name} {command}"] + sys.argv[2:]
     try:
         # Try importing as installed package first, then as local module
         try:
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+
+"""
+Metrics Exporter - Use Case Script
+
+This script serves the health check metrics over HTTP for Prometheus:
+- GET /metrics returns the health collectors' values in the Prometheus
+  text exposition format (version 0.0.4)
+- Collections are cached for a short time (METRICS_CACHE_TTL); when many
+  scrapers arrive at once, only one of them runs the collectors and the
+  others wait for its result
+- Requests are served by a threaded HTTP server
+
+Usage:
+    python3 metrics_exporter.py [--listen HOST] [--port PORT] [--cache-ttl SEC]
+    curl http://localhost:9120/metrics
+
+Author: DevOps Automation Team
+Version: 1.0.0
+"""
+
+import argparse
+import signal
+import socket
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+from pathlib import Path
+from typing import Callable, List, Optional
+
+sys.path.insert(0, str(Path(__file__).parent))
+from common import (
+    init_directories, print_info, print_success, log,
+    METRICS_EXPORTER_HOST, METRICS_EXPORTER_PORT, METRICS_CACHE_TTL
+)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class CachedCollector:
+    """
+    Runs a collector at most once per TTL.
+
+    Concurrent callers that find the cache expired queue on a lock: the
+    first one collects, the others reuse its result (single flight). A
+    failed collection is cached for the TTL as well: callers get the last
+    successful value (or None) together with the error.
+    """
+
+    def __init__(self, collect: Callable[[], dict], ttl: float = METRICS_CACHE_TTL):
+        self.collect = collect
+        self.ttl = ttl
+        self.collections = 0
+        self._lock = threading.Lock()
+        self._value = None
+        self._error = None
+        self._collected_at = None
+        self._duration = 0.0
+
+    def _fresh(self) -> bool:
+        return self._collected_at is not None and time.monotonic() - self._collected_at < self.ttl
+
+    def get(self):
+        """
+        Return (value, collection duration in seconds, error), collecting if
+        the cache expired. error is None when the last collection succeeded.
+        """
+        if self._fresh():
+            return self._value, self._duration, self._error
+        with self._lock:
+            # Another caller may have collected while we waited for the lock
+            if not self._fresh():
+                started = time.monotonic()
+                try:
+                    self._value = self.collect()
+                    self._error = None
+                except Exception as e:
+                    self._error = e
+                    log("ERROR", f"Metrics collection failed: {e}")
+                self._duration = time.monotonic() - started
+                self._collected_at = time.monotonic()
+                self.collections += 1
+            return self._value, self._duration, self._error
+
+
+def _escape_label(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class MetricFamily:
+    """A metric name with its HELP/TYPE lines and samples."""
+
+    def __init__(self, name: str, help_text: str, metric_type: str = 'gauge'):
+        self.name = name
+        self.help_text = help_text
+        self.metric_type = metric_type
+        self.samples = []
+
+    def add(self, value, **labels):
+        if value is not None:
+            self.samples.append((labels, float(value)))
+        return self
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.metric_type}"]
+        for labels, value in self.samples:
+            label_text = ""
+            if labels:
+                label_text = "{" + ",".join(f'{key}="{_escape_label(val)}"'
+                                            for key, val in labels.items()) + "}"
+            lines.append(f"{self.name}{label_text} {value!r}")
+        return lines
+
+
+def health_families(health: dict) -> List[MetricFamily]:
+    """Convert a collect_health() result into metric families."""
+    cpu = health.get('cpu') or {}
+    families = [
+        MetricFamily('lsm_cpu_usage_percent', "Total CPU usage.").add(cpu.get('usage')),
+    ]
+    modes = MetricFamily('lsm_cpu_mode_percent', "CPU time share per mode.")
+    for mode, value in (cpu.get('modes') or {}).items():
+        modes.add(value, mode=mode)
+    cores = MetricFamily('lsm_cpu_core_usage_percent', "CPU usage per core.")
+    for core, value in (cpu.get('per_core') or {}).items():
+        cores.add(value, core=core)
+    families += [modes, cores]
+
+    memory = health.get('memory') or {}
+    families += [
+        MetricFamily('lsm_memory_total_bytes', "Total memory.").add(memory.get('total')),
+        MetricFamily('lsm_memory_used_bytes', "Used memory.").add(memory.get('used')),
+        MetricFamily('lsm_memory_available_bytes', "Available memory.").add(memory.get('free')),
+        MetricFamily('lsm_memory_usage_percent', "Memory usage.").add(memory.get('percent')),
+    ]
+
+    disks = MetricFamily('lsm_disk_usage_percent', "Filesystem usage.")
+    for disk in health.get('disks') or []:
+        disks.add(disk['usage'], filesystem=disk['filesystem'], mountpoint=disk['mount_point'])
+    families.append(disks)
+
+    load = MetricFamily('lsm_load_average', "System load average.")
+    for period, value in zip(('1m', '5m', '15m'), health.get('load_average') or []):
+        load.add(value, period=period)
+    families.append(load)
+
+    network = MetricFamily('lsm_network_up', "Whether a connectivity target was reachable.")
+    latency = MetricFamily('lsm_network_connect_seconds',
+                           "TCP connect time to a connectivity target (min/avg/p95 of the attempts).")
+    for target in health.get('network') or []:
+        network.add(1 if target['ok'] else 0, target=target['name'])
+        for stat, value in (target.get('latency_ms') or {}).items():
+            latency.add(value / 1000, target=target['name'], stat=stat)
+    families += [network, latency]
+    return families
+
+
+def render_metrics(health: Optional[dict], duration: float, up: bool = True) -> str:
+    """
+    Render health metrics in the Prometheus text exposition format.
+
+    After a failed collection (up=False) the previous values, if any, are
+    still rendered, and lsm_up is 0 to mark them as stale.
+    """
+    families = health_families(health) if health is not None else []
+    families += [
+        MetricFamily('lsm_collect_duration_seconds',
+                     "Time spent running the health collectors.").add(round(duration, 6)),
+        MetricFamily('lsm_up', "Whether the last collection succeeded.").add(1 if up else 0),
+    ]
+    lines = []
+    for family in families:
+        if family.samples:
+            lines.extend(family.render())
+    return "\n".join(lines) + "\n"
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    """Serves /metrics from the server's CachedCollector."""
+
+    server_version = "lsm-metrics-exporter/1.0"
+
+    def do_GET(self):
+        path = self.path.split('?', 1)[0]
+        if path == '/metrics':
+            health, duration, error = self.server.collector.get()
+            self._send(200, render_metrics(health, duration, up=error is None), CONTENT_TYPE)
+        elif path == '/':
+            self._send(200, '<html><body><a href="/metrics">Metrics</a></body></html>\n',
+                       "text/html; charset=utf-8")
+        else:
+            self._send(404, "not found\n", "text/plain; charset=utf-8")
+
+    def _send(self, status: int, body: str, content_type: str):
+        data = body.encode()
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        # Scrapes are frequent; do not write an access line for each one
+        pass
+
+
+class MetricsServer(ThreadingMixIn, HTTPServer):
+    """HTTP server handling each request in its own thread."""
+
+    daemon_threads = True
+    # Many scrapers may connect at the same moment
+    request_queue_size = 128
+
+    def __init__(self, address, collector: CachedCollector):
+        self.collector = collector
+        if ':' in address[0]:
+            self.address_family = socket.AF_INET6
+        super().__init__(address, MetricsHandler)
+
+
+def create_server(host: str = METRICS_EXPORTER_HOST, port: int = METRICS_EXPORTER_PORT,
+                  cache_ttl: float = METRICS_CACHE_TTL,
+                  collect: Optional[Callable[[], dict]] = None) -> MetricsServer:
+    """Create a metrics server backed by the health collectors."""
+    if collect is None:
+        from health_check import collect_health
+        collect = collect_health
+    return MetricsServer((host, port), CachedCollector(collect, cache_ttl))
+
+
+def parse_args(argv=None):
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Serve health metrics for Prometheus")
+    parser.add_argument('--listen', default=METRICS_EXPORTER_HOST, metavar='HOST',
+                        help=f"address to listen on (default: {METRICS_EXPORTER_HOST})")
+    parser.add_argument('--port', type=int, default=METRICS_EXPORTER_PORT,
+                        help=f"port to listen on (default: {METRICS_EXPORTER_PORT})")
+    parser.add_argument('--cache-ttl', type=float, default=METRICS_CACHE_TTL, metavar='SEC',
+                        help=f"seconds a collection is reused (default: {METRICS_CACHE_TTL})")
+    return parser.parse_args(argv)
+
+
+def main():
+    """Main function."""
+    args = parse_args()
+    init_directories()
+
+    server = create_server(args.listen, args.port, args.cache_ttl)
+    # SystemExit interrupts serve_forever() in the main thread
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
+    print_info(f"Serving metrics on http://{args.listen}:{args.port}/metrics")
+    log("INFO", f"Metrics exporter started on {args.listen}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    print_success("Metrics exporter stopped")
+    log("INFO", "Metrics exporter stopped")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+
+"""
+Health Metrics Store - Use Case Script
+
+This module keeps health check samples in an embedded time-series store:
+- Append-only files of fixed-width binary records (no parsing of reports)
+- Reads go through mmap and a binary search on the timestamp, so a query
+  only touches the records of its time range
+- Rollups at 1m, 5m and 1h resolution (count, min, max and sum per metric)
+  are updated on every append; long ranges are answered from them
+- Queries return series or summaries (min/avg/max and p50/p95/p99)
+
+Files under reports/metrics/:
+
+    samples.dat     float64 timestamp + float32 per metric (NaN = missing)
+    rollup-1m.dat   int64 bucket start + (uint32 count, float32 min,
+    rollup-5m.dat   float32 max, float64 sum) per metric
+    rollup-1h.dat
+
+Usage:
+    python3 metrics_store.py summary memory --since 7d
+    python3 metrics_store.py series cpu --since 6h --resolution 5m
+
+Author: DevOps Automation Team
+Version: 1.0.0
+"""
+
+import argparse
+import json
+import math
+import mmap
+import os
+import struct
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # not available on Windows
+    fcntl = None
+
+sys.path.insert(0, str(Path(__file__).parent))
+from common import print_error, print_info, METRICS_DIR
+
+# Stored metrics, in record order
+METRICS = ('cpu', 'memory', 'disk', 'load1', 'load5', 'load15')
+METRIC_UNITS = {
+    'cpu': 'percent',
+    'memory': 'percent',
+    'disk': 'percent',
+    'load1': '',
+    'load5': '',
+    'load15': '',
+}
+
+# Rollup resolutions in seconds, finest first
+RESOLUTIONS = {'1m': 60, '5m': 300, '1h': 3600}
+
+# A query reads raw samples while the range holds at most this many points,
+# then falls back to the finest rollup that fits
+MAX_QUERY_POINTS = 200000
+
+_SAMPLE = struct.Struct('<d' + 'f' * len(METRICS))
+_ROLLUP = struct.Struct('<q' + 'Iffd' * len(METRICS))
+# Leading timestamp field of each record type
+_SAMPLE_KEY = struct.Struct('<d')
+_ROLLUP_KEY = struct.Struct('<q')
+
+_DURATION_UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400, 'w': 604800}
+
+
+def parse_duration(text: str) -> float:
+    """Parse a duration such as '90s', '15m', '6h', '7d' or '2w' into seconds."""
+    unit = text[-1:].lower()
+    if unit not in _DURATION_UNITS:
+        raise ValueError(f"Invalid duration: {text} (use s, m, h, d or w)")
+    return float(text[:-1]) * _DURATION_UNITS[unit]
+
+
+def percentile(sorted_values: List[float], p: float) -> Optional[float]:
+    """Percentile of sorted values, with linear interpolation between ranks."""
+    if not sorted_values:
+        return None
+    rank = (len(sorted_values) - 1) * p / 100
+    low = int(rank)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (rank - low)
+
+
+def _search(mm, record: struct.Struct, key: struct.Struct, count: int, timestamp: float) -> int:
+    """Index of the first record whose timestamp is >= timestamp (records are sorted)."""
+    low, high = 0, count
+    while low < high:
+        mid = (low + high) // 2
+        (ts,) = key.unpack_from(mm, mid * record.size)
+        if ts < timestamp:
+            low = mid + 1
+        else:
+            high = mid
+    return low
+
+
+class _MappedFile:
+    """Read-only mmap of a record file (empty files cannot be mapped)."""
+
+    def __init__(self, path: Path, record_size: int):
+        self.count = 0
+        self.mm = None
+        self._file = None
+        if not path.exists():
+            return
+        size = path.stat().st_size
+        self.count = size // record_size
+        if self.count:
+            self._file = open(path, 'rb')
+            self.mm = mmap.mmap(self._file.fileno(), self.count * record_size,
+                                access=mmap.ACCESS_READ)
+
+    def close(self):
+        if self.mm is not None:
+            self.mm.close()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+class MetricsStore:
+    """Append-only time-series store for health metrics."""
+
+    def __init__(self, directory: Path = METRICS_DIR):
+        self.directory = directory
+        self.samples_file = directory / "samples.dat"
+
+    def rollup_file(self, resolution: str) -> Path:
+        return self.directory / f"rollup-{resolution}.dat"
+
+    def append(self, values: Dict[str, Optional[float]], timestamp: Optional[float] = None):
+        """
+        Append one sample and update the rollups.
+
+        Missing metrics (None) are stored as NaN. Samples must be appended
+        in time order: a sample older than the last one is dropped and
+        False is returned.
+        """
+        timestamp = time.time() if timestamp is None else timestamp
+        row = [float('nan') if values.get(m) is None else float(values[m]) for m in METRICS]
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        with open(self.samples_file, 'ab+') as f:
+            # Cron runs and the daemon may append at the same time
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                size = f.seek(0, os.SEEK_END)
+                size -= size % _SAMPLE.size
+                if size:
+                    f.seek(size - _SAMPLE.size)
+                    (last_ts,) = struct.unpack('<d', f.read(8))
+                    if timestamp < last_ts:
+                        return False
+                f.truncate(size)
+                f.seek(size)
+                f.write(_SAMPLE.pack(timestamp, *row))
+                for resolution, seconds in RESOLUTIONS.items():
+                    self._update_rollup(self.rollup_file(resolution), seconds, timestamp, row)
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+        return True
+
+    def _update_rollup(self, path: Path, seconds: int, timestamp: float, row: List[float]):
+        bucket = int(timestamp // seconds * seconds)
+        with open(path, 'ab+') as f:
+            size = f.seek(0, os.SEEK_END)
+            size -= size % _ROLLUP.size
+            fields = None
+            if size:
+                f.seek(size - _ROLLUP.size)
+                last = _ROLLUP.unpack(f.read(_ROLLUP.size))
+                if last[0] == bucket:
+                    fields = list(last[1:])
+                    size -= _ROLLUP.size
+            if fields is None:
+                fields = [0, float('nan'), float('nan'), 0.0] * len(METRICS)
+            for i, value in enumerate(row):
+                if math.isnan(value):
+                    continue
+                count, low, high, total = fields[i * 4:i * 4 + 4]
+                fields[i * 4:i * 4 + 4] = [
+                    count + 1,
+                    value if count == 0 else min(low, value),
+                    value if count == 0 else max(high, value),
+                    total + value,
+                ]
+            # The open bucket is the last record and is rewritten in place
+            f.truncate(size)
+            f.seek(size)
+            f.write(_ROLLUP.pack(bucket, *fields))
+
+    def _choose_resolution(self, start: float, end: float) -> str:
+        with _MappedFile(self.samples_file, _SAMPLE.size) as raw:
+            if raw.count == 0:
+                return 'raw'
+            first = _search(raw.mm, _SAMPLE, _SAMPLE_KEY, raw.count, start)
+            last = _search(raw.mm, _SAMPLE, _SAMPLE_KEY, raw.count, end)
+            if last - first <= MAX_QUERY_POINTS:
+                return 'raw'
+        for resolution, seconds in RESOLUTIONS.items():
+            if (end - start) / seconds <= MAX_QUERY_POINTS:
+                return resolution
+        return list(RESOLUTIONS)[-1]
+
+    def query(self, metric: str, start: float, end: Optional[float] = None,
+              resolution: str = 'auto') -> Tuple[str, List[Tuple[float, float]]]:
+        """
+        Read the points of one metric in [start, end).
+
+        Raw samples are returned as (timestamp, value), rollups as
+        (bucket start, mean). Returns (resolution used, points). Summaries
+        computed from rollups are therefore percentiles of bucket means.
+        """
+        if metric not in METRICS:
+            raise ValueError(f"Unknown metric: {metric}")
+        end = time.time() if end is None else end
+        if resolution == 'auto':
+            resolution = self._choose_resolution(start, end)
+        index = METRICS.index(metric)
+
+        points = []
+        if resolution == 'raw':
+            with _MappedFile(self.samples_file, _SAMPLE.size) as raw:
+                if raw.count:
+                    first = _search(raw.mm, _SAMPLE, _SAMPLE_KEY, raw.count, start)
+                    last = _search(raw.mm, _SAMPLE, _SAMPLE_KEY, raw.count, end)
+                    view = raw.mm[first * _SAMPLE.size:last * _SAMPLE.size]
+                    for record in _SAMPLE.iter_unpack(view):
+                        value = record[index + 1]
+                        if not math.isnan(value):
+                            points.append((record[0], value))
+            return resolution, points
+
+        if resolution not in RESOLUTIONS:
+            raise ValueError(f"Unknown resolution: {resolution}")
+        with _MappedFile(self.rollup_file(resolution), _ROLLUP.size) as rollup:
+            if rollup.count:
+                # A bucket that started before `start` still overlaps the range
+                first = _search(rollup.mm, _ROLLUP, _ROLLUP_KEY, rollup.count,
+                                start - RESOLUTIONS[resolution] + 1)
+                last = _search(rollup.mm, _ROLLUP, _ROLLUP_KEY, rollup.count, end)
+                view = rollup.mm[first * _ROLLUP.size:last * _ROLLUP.size]
+                for record in _ROLLUP.iter_unpack(view):
+                    count = record[1 + index * 4]
+                    if count:
+                        points.append((float(record[0]), record[4 + index * 4] / count))
+        return resolution, points
+
+    def summary(self, metric: str, start: float, end: Optional[float] = None,
+                resolution: str = 'auto') -> dict:
+        """Summarize one metric over a time range (count, min, avg, max, p50, p95, p99)."""
+        used, points = self.query(metric, start, end, resolution)
+        values = sorted(value for _, value in points)
+        return {
+            'metric': metric,
+            'resolution': used,
+            'count': len(values),
+            'min': values[0] if values else None,
+            'avg': sum(values) / len(values) if values else None,
+            'max': values[-1] if values else None,
+            'p50': percentile(values, 50),
+            'p95': percentile(values, 95),
+            'p99': percentile(values, 99),
+        }
+
+
+def _format_value(value) -> str:
+    return "-" if value is None else f"{value:.2f}"
+
+
+def parse_args(argv=None):
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Query stored health metrics")
+    parser.add_argument('action', choices=('summary', 'series'),
+                        help="summary statistics or the individual points")
+    parser.add_argument('metric', choices=METRICS)
+    parser.add_argument('--since', default='24h',
+                        help="time range, e.g. 30m, 6h, 7d (default: 24h)")
+    parser.add_argument('--resolution', choices=('auto', 'raw') + tuple(RESOLUTIONS),
+                        default='auto', help="data to read (default: auto)")
+    parser.add_argument('--json', action='store_true', help="print JSON")
+    return parser.parse_args(argv)
+
+
+def main():
+    """Main function."""
+    args = parse_args()
+    try:
+        start = time.time() - parse_duration(args.since)
+    except ValueError as e:
+        print_error(str(e))
+        sys.exit(1)
+
+    store = MetricsStore()
+    started = time.perf_counter()
+    if args.action == 'summary':
+        result = store.summary(args.metric, start, resolution=args.resolution)
+        elapsed = (time.perf_counter() - started) * 1000
+        if args.json:
+            print(json.dumps(result))
+            return
+        unit = METRIC_UNITS[args.metric]
+        print(f"{args.metric} over the last {args.since} "
+              f"({result['count']} points, {result['resolution']}, {elapsed:.1f} ms)")
+        for key in ('min', 'avg', 'p50', 'p95', 'p99', 'max'):
+            print(f"  {key:<4} {_format_value(result[key])} {unit}".rstrip())
+        return
+
+    resolution, points = store.query(args.metric, start, resolution=args.resolution)
+    if args.json:
+        print(json.dumps({'metric': args.metric, 'resolution': resolution, 'points': points}))
+        return
+    print_info(f"{len(points)} points ({resolution})")
+    for timestamp, value in points:
+        print(f"{datetime.fromtimestamp(timestamp).isoformat(timespec='seconds')}  "
+              f"{_format_value(value)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+
+"""
+Procfs Metrics Collector
+
+This module reads CPU, memory and disk metrics straight from the kernel
+interfaces instead of starting helper processes:
+- /proc/stat for CPU time counters (see cpu_sampler.py for utilisation)
+- /proc/meminfo for memory usage
+- /proc/self/mountinfo + os.statvfs for disk usage
+
+All functions return None (or an empty list) when the interface is not
+available, so callers can fall back to the subprocess-based path.
+"""
+
+import math
+import os
+import re
+from typing import Dict, List, Optional
+
+PROC_STAT = "/proc/stat"
+PROC_MEMINFO = "/proc/meminfo"
+PROC_MOUNTINFO = "/proc/self/mountinfo"
+
+# Field order of the "cpu" lines in /proc/stat (see proc(5))
+CPU_FIELDS = (
+    'user', 'nice', 'system', 'idle', 'iowait',
+    'irq', 'softirq', 'steal', 'guest', 'guest_nice',
+)
+
+
+def is_available() -> bool:
+    """Check if the procfs interfaces used by this module are readable."""
+    return os.access(PROC_STAT, os.R_OK) and os.access(PROC_MEMINFO, os.R_OK)
+
+
+def read_cpu_times() -> Optional[Dict[str, Dict[str, int]]]:
+    """
+    Read the raw CPU time counters from /proc/stat.
+
+    Returns a mapping of CPU name ('cpu' for the aggregate, 'cpu0', 'cpu1', ...)
+    to a dict of counters keyed by CPU_FIELDS, in clock ticks.
+    """
+    try:
+        with open(PROC_STAT, 'r') as f:
+            lines = f.readlines()
+    except OSError:
+        return None
+
+    cpu_times = {}
+    for line in lines:
+        if not line.startswith('cpu'):
+            # The cpu lines come first; stop at the first other line
+            break
+        parts = line.split()
+        values = [int(v) for v in parts[1:len(CPU_FIELDS) + 1]]
+        values.extend([0] * (len(CPU_FIELDS) - len(values)))
+        cpu_times[parts[0]] = dict(zip(CPU_FIELDS, values))
+    return cpu_times or None
+
+
+def read_meminfo() -> Optional[Dict[str, int]]:
+    """Read /proc/meminfo into a dict of values in bytes."""
+    try:
+        with open(PROC_MEMINFO, 'r') as f:
+            lines = f.readlines()
+    except OSError:
+        return None
+
+    meminfo = {}
+    for line in lines:
+        key, _, value = line.partition(':')
+        parts = value.split()
+        if not parts:
+            continue
+        amount = int(parts[0])
+        if len(parts) > 1 and parts[1] == 'kB':
+            amount *= 1024
+        meminfo[key.strip()] = amount
+    return meminfo
+
+
+def get_memory_info() -> Optional[Dict[str, float]]:
+    """Get memory usage information in the same shape as health_check."""
+    meminfo = read_meminfo()
+    if not meminfo or 'MemTotal' not in meminfo:
+        return None
+
+    total = meminfo['MemTotal']
+    if 'MemAvailable' in meminfo:
+        available = meminfo['MemAvailable']
+    else:
+        # Kernels older than 3.14 do not export MemAvailable
+        available = (meminfo.get('MemFree', 0) + meminfo.get('Buffers', 0) +
+                     meminfo.get('Cached', 0) + meminfo.get('SReclaimable', 0))
+    used = total - available
+
+    return {
+        'total': total,
+        'used': used,
+        'free': available,
+        'percent': (used / total) * 100 if total > 0 else 0
+    }
+
+
+def _unescape_mount_field(field: str) -> str:
+    """Decode the octal escapes (\\040 for space, etc.) used in mountinfo."""
+    return re.sub(r'\\([0-7]{3})', lambda m: chr(int(m.group(1), 8)), field)
+
+
+def read_mounts() -> Optional[List[Dict[str, str]]]:
+    """
+    Read mounted filesystems from /proc/self/mountinfo.
+
+    Returns a list of dicts with 'source', 'mount_point' and 'fstype'.
+    """
+    try:
+        with open(PROC_MOUNTINFO, 'r') as f:
+            lines = f.readlines()
+    except OSError:
+        return None
+
+    mounts = []
+    for line in lines:
+        # Optional fields end with a lone "-" separator (see proc(5))
+        head, sep, tail = line.partition(' - ')
+        if not sep:
+            continue
+        head_parts = head.split()
+        tail_parts = tail.split()
+        if len(head_parts) < 5 or len(tail_parts) < 2:
+            continue
+        mounts.append({
+            'source': _unescape_mount_field(tail_parts[1]),
+            'mount_point': _unescape_mount_field(head_parts[4]),
+            'fstype': tail_parts[0],
+        })
+    return mounts
+
+
+def get_disk_usage() -> Optional[List[Dict]]:
+    """
+    Get disk usage for block-device backed filesystems.
+
+    Mirrors the '/dev/' filter and rounding of 'df' so reports keep the
+    same numbers as the subprocess-based implementation.
+    """
+    mounts = read_mounts()
+    if mounts is None:
+        return None
+
+    disk_info = []
+    seen_mount_points = set()
+    # Later entries shadow earlier ones mounted on the same path
+    for mount in reversed(mounts):
+        if mount['mount_point'] in seen_mount_points:
+            continue
+        seen_mount_points.add(mount['mount_point'])
+        if not mount['source'].startswith('/dev/'):
+            continue
+        try:
+            st = os.statvfs(mount['mount_point'])
+        except OSError:
+            continue
+
+        used = (st.f_blocks - st.f_bfree) * st.f_frsize
+        available = st.f_bavail * st.f_frsize
+        if used + available <= 0:
+            continue
+        disk_info.append({
+            'filesystem': mount['source'],
+            'usage': int(math.ceil(used * 100 / (used + available))),
+            'mount_point': mount['mount_point']
+        })
+
+    disk_info.reverse()
+    return disk_info
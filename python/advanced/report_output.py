@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+
+"""
+Structured Report Output
+
+This module provides the machine-readable output mode shared by the
+report generators (health_check, full_report, user_audit, service_status):
+- NDJSON: one JSON record per line, flushed as soon as it is produced
+- JSON: the same records collected into a single document
+
+Every record follows the same schema (SCHEMA_VERSION):
+
+    {
+      "schema": "lsm.report.v1",    # schema identifier
+      "report": "health_check",     # report generator
+      "run_id": "20240115-103045-4242",
+      "host": "web-01",
+      "ts": "2024-01-15T10:30:45",  # time the record was produced
+      "seq": 3,                     # position of the record in the run
+      "type": "metric",             # report_start | metric | item | partial | report_end
+      "section": "memory",
+      "name": "usage",              # optional, metric name
+      "value": 51.25,               # optional, metric value
+      "unit": "percent",            # optional
+      "status": "ok",               # optional, ok | warning
+      "data": {...}                 # optional, structured payload for items
+    }
+
+Usage:
+    python3 health_check.py --format ndjson --output -
+    python3 full_report.py --format json --output report.json
+"""
+
+import argparse
+import json
+import os
+import socket
+import sys
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from common import console_to_stderr, REPORT_DIR
+
+SCHEMA_VERSION = "lsm.report.v1"
+FORMATS = ('text', 'ndjson', 'json')
+
+
+class RecordWriter:
+    """Writes report records in NDJSON or JSON format."""
+
+    def __init__(self, report: str, stream, fmt: str = 'ndjson'):
+        self.report = report
+        self.stream = stream
+        self.fmt = fmt
+        self.run_id = f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+        self.host = socket.gethostname()
+        self.seq = 0
+        self._records = []
+
+    def emit(self, record_type: str, section: str = None, name: str = None,
+             value=None, unit: str = None, status: str = None, data=None):
+        """Write a single record."""
+        self.seq += 1
+        record = {
+            'schema': SCHEMA_VERSION,
+            'report': self.report,
+            'run_id': self.run_id,
+            'host': self.host,
+            'ts': datetime.now().isoformat(timespec='seconds'),
+            'seq': self.seq,
+            'type': record_type,
+            'section': section,
+        }
+        if name is not None:
+            record['name'] = name
+        if value is not None:
+            record['value'] = value
+        if unit is not None:
+            record['unit'] = unit
+        if status is not None:
+            record['status'] = status
+        if data is not None:
+            record['data'] = data
+
+        if self.fmt == 'json':
+            self._records.append(record)
+        else:
+            self.stream.write(json.dumps(record, default=str) + "\n")
+            self.stream.flush()
+
+    def metric(self, section: str, name: str, value, unit: str = None, status: str = None):
+        """Write a metric record."""
+        self.emit('metric', section, name=name, value=value, unit=unit, status=status)
+
+    def item(self, section: str, data: dict, name: str = None):
+        """Write one entry of a list (a user, a disk, a service, ...)."""
+        self.emit('item', section, name=name, data=data)
+
+    def partial(self, section: str, reason: str):
+        """Record that a section could not be collected."""
+        self.emit('partial', section, data={'reason': reason})
+
+    def begin(self):
+        self.emit('report_start')
+
+    def end(self):
+        self.emit('report_end', data={'records': self.seq + 1})
+        if self.fmt == 'json':
+            json.dump({'schema': SCHEMA_VERSION, 'report': self.report,
+                       'run_id': self.run_id, 'records': self._records},
+                      self.stream, indent=2, default=str)
+            self.stream.write("\n")
+            self.stream.flush()
+
+
+def add_output_arguments(parser: argparse.ArgumentParser):
+    """Add the --format and --output options to a report's argument parser."""
+    parser.add_argument('--format', choices=FORMATS, default='text',
+                        help="report format (default: text)")
+    parser.add_argument('--output', metavar='PATH',
+                        help="file to write structured output to, '-' for stdout "
+                             "(default: a timestamped file in the reports directory)")
+
+
+def parse_output_args(description: str, argv=None):
+    """Parse the standard output options of a report generator."""
+    parser = argparse.ArgumentParser(description=description)
+    add_output_arguments(parser)
+    args = parser.parse_args(argv)
+    if args.format != 'text' and args.output == '-':
+        # Keep stdout clean for the record stream
+        console_to_stderr()
+    return args
+
+
+def run_structured(report: str, args, producer) -> str:
+    """
+    Run `producer(writer)` with a RecordWriter for the requested output.
+
+    Returns a description of where the records were written.
+    """
+    if args.output == '-':
+        console_to_stderr()
+        writer = RecordWriter(report, sys.stdout, args.format)
+        writer.begin()
+        producer(writer)
+        writer.end()
+        return "stdout"
+
+    if args.output:
+        output_file = Path(args.output)
+    else:
+        extension = 'ndjson' if args.format == 'ndjson' else 'json'
+        report_name = report.replace('_', '-')
+        output_file = REPORT_DIR / f"{report_name}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.{extension}"
+
+    with open(output_file, 'w') as f:
+        writer = RecordWriter(report, f, args.format)
+        writer.begin()
+        producer(writer)
+        writer.end()
+    return str(output_file)
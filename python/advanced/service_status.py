@@ -9,7 +9,7 @@ This script checks the status of system services:
 - Generates service status report
 
 Usage:
-    python3 service_status.py
+    python3 service_status.py [--format text|ndjson|json] [--output PATH|-]
 
 Author: DevOps Automation Team
 Version: 1.0.0
@@ -22,6 +22,7 @@ from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent))
 from common import init_directories, print_info, print_success, print_warning, log, REPORT_DIR
+from report_output import parse_output_args, run_structured
 
 
 def get_service_status():
@@ -56,10 +57,69 @@ def get_failed_services():
     return None
 
 
+def parse_failed_units(failed_services: str) -> list:
+    """Extract failed unit names from 'systemctl list-units' output."""
+    units = []
+    for line in failed_services.split('\n'):
+        if '.service' not in line or 'failed' not in line.lower():
+            continue
+        parts = line.replace('\u25cf', ' ').split()
+        if parts:
+            units.append(parts[0])
+    return units
+
+
+def parse_unit_lines(services: str) -> list:
+    """Parse 'systemctl list-units' output into unit dictionaries."""
+    units = []
+    for line in services.split('\n'):
+        parts = line.replace('\u25cf', ' ').split(None, 4)
+        if len(parts) < 4 or not parts[0].endswith('.service'):
+            continue
+        units.append({
+            'unit': parts[0],
+            'load': parts[1],
+            'active': parts[2],
+            'sub': parts[3],
+            'description': parts[4] if len(parts) > 4 else '',
+        })
+    return units
+
+
+def emit_services(writer):
+    """Stream one record per service unit."""
+    all_services = get_service_status()
+    if all_services is None:
+        writer.partial('services', "systemctl not available")
+        return
+    units = parse_unit_lines(all_services)
+    for unit in units:
+        writer.item('services', unit, name=unit['unit'])
+    failed = [unit for unit in units if unit['active'] == 'failed']
+    writer.metric('services', 'total', len(units))
+    writer.metric('services', 'failed', len(failed),
+                  status='warning' if failed else 'ok')
+
+
+def collect_services() -> dict:
+    """Collect failed service information into a dictionary (no report file)."""
+    failed_services = get_failed_services()
+    if failed_services is None:
+        return {'available': False, 'failed': []}
+    return {'available': True, 'failed': parse_failed_units(failed_services)}
+
+
 def main():
     """Main function."""
+    args = parse_output_args("Check status of system services")
     init_directories()
     
+    if args.format != 'text':
+        destination = run_structured('service_status', args, emit_services)
+        print_success(f"Service status records written to: {destination}")
+        log("INFO", f"Service status check completed. Records: {destination}")
+        return
+    
     print_info("Checking service status...")
     report_file = REPORT_DIR / f"services-{datetime.now().strftime('%Y%m%d-%H%M%S')}.txt"
     
@@ -10,7 +10,7 @@ This script performs security-focused user account auditing:
 - Shows recent login history
 
 Usage:
-    python3 user_audit.py
+    python3 user_audit.py [--format text|ndjson|json] [--output PATH|-]
 
 Author: DevOps Automation Team
 Version: 1.0.0
@@ -31,6 +31,10 @@ except ImportError:
 
 sys.path.insert(0, str(Path(__file__).parent))
 from common import init_directories, print_info, print_success, print_warning, log, REPORT_DIR
+from report_output import parse_output_args, run_structured
+
+# Login shells that do not grant interactive access
+NOLOGIN_SHELLS = ['/usr/sbin/nologin', '/sbin/nologin', '/bin/false', '/usr/bin/false']
 
 
 def get_all_users():
@@ -113,10 +117,54 @@ def get_recent_logins():
     return recent_logins
 
 
+def get_shell_users(users: list) -> list:
+    """Get users whose login shell allows interactive access."""
+    return [u for u in users if u['shell'] not in NOLOGIN_SHELLS]
+
+
+def emit_audit(writer):
+    """Stream one record per user, sudo user and recent login."""
+    users = get_all_users()
+    sudo_users = set(get_sudo_users())
+    shell_names = {u['name'] for u in get_shell_users(users)}
+    for user in users:
+        data = dict(user)
+        data['shell_access'] = user['name'] in shell_names
+        data['sudo'] = user['name'] in sudo_users
+        writer.item('users', data, name=user['name'])
+    writer.metric('users', 'total', len(users))
+    writer.metric('users', 'shell_access', len(shell_names))
+    writer.metric('users', 'sudo', len(sudo_users))
+
+    recent_logins = [login for login in get_recent_logins() if login.strip()]
+    if recent_logins:
+        for login in recent_logins:
+            writer.item('logins', {'line': login})
+    else:
+        writer.partial('logins', "unable to retrieve login history")
+
+
+def collect_audit() -> dict:
+    """Collect user audit information into a dictionary (no report file)."""
+    users = get_all_users()
+    return {
+        'total_users': len(users),
+        'shell_users': [u['name'] for u in get_shell_users(users)],
+        'sudo_users': sorted(get_sudo_users()),
+    }
+
+
 def main():
     """Main function."""
+    args = parse_output_args("Audit user accounts and permissions")
     init_directories()
     
+    if args.format != 'text':
+        destination = run_structured('user_audit', args, emit_audit)
+        print_success(f"User audit records written to: {destination}")
+        log("INFO", f"User audit completed. Records: {destination}")
+        return
+    
     print_info("Starting user account audit...")
     report_file = REPORT_DIR / f"user-audit-{datetime.now().strftime('%Y%m%d-%H%M%S')}.txt"
     
@@ -138,7 +186,7 @@ def main():
         
         # Users with shell access
         f.write("--- Users with Shell Access ---\n")
-        shell_users = [u for u in users if u['shell'] not in ['/usr/sbin/nologin', '/sbin/nologin', '/bin/false', '/usr/bin/false']]
+        shell_users = get_shell_users(users)
         for user in shell_users:
             f.write(f"{user['name']:<20} {user['shell']}\n")
         f.write(f"\nTotal users with shell access: {len(shell_users)}\n\n")
@@ -4,12 +4,29 @@
 
 import platform
 import subprocess
+import sys
 import time
 from datetime import datetime
+from pathlib import Path
+
+# Share the delta-based CPU sampler from python/advanced when it is present.
+# Each loop iteration then measures CPU over the 5 second sleep instead of
+# starting 'top' or blocking in psutil.cpu_percent(interval=1).
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "advanced"))
+try:
+    from cpu_sampler import get_sampler
+except ImportError:
+    get_sampler = None
 
 
 def get_cpu_usage():
     try:
+        # Use the shared /proc/stat sampler on Linux
+        if get_sampler is not None and platform.system() == "Linux":
+            cpu_usage = get_sampler().get_usage()
+            if cpu_usage is not None:
+                return cpu_usage
+        
         # Try using psutil if available (most reliable)
         try:
             import psutil